@@ -73,6 +73,7 @@ __DEFAULTS__ = {
     'rman_show_advanced_params': False,      
     'rman_config_dir': "",
     'rman_viewport_refresh_rate': 0.01,
+    'rman_ipr_update_interval': 0.05,
     'rman_solo_collapse_nodes': True,
     'rman_use_blend_dir_token': True,          
     'rman_ui_framework': "NATIVE",
@@ -453,6 +454,15 @@ class RendermanPreferences(AddonPreferences):
         max=0.1
     )    
 
+    rman_ipr_update_interval: FloatProperty(
+        name="IPR Update Interval",
+        description="The minimum number of seconds between scene edits sent to the renderer during IPR. Changes made in between, ex: while dragging a slider, are merged and sent together. Set to 0 to send every change immediately.",
+        default=0.05,
+        precision=3,
+        min=0.0,
+        max=1.0
+    )
+
     rman_solo_collapse_nodes: BoolProperty(
         name="Collapse Non-Solo Nodes",
         default=True,
@@ -695,6 +705,7 @@ class RendermanPreferences(AddonPreferences):
             col.label(text='Other', icon_value=rman_r_icon.icon_id)
 
             col.prop(self, 'rman_viewport_refresh_rate')  
+            col.prop(self, 'rman_ipr_update_interval')
             col.prop(self, 'rman_config_dir')   
             if self.rman_do_preview_renders:
                 col.prop(self, 'rman_preview_renders_minSamples')
@@ -1,8 +1,12 @@
 import unittest
 from RenderManForBlender.rfb_unittests.test_string_expr import StringExprTest
+from RenderManForBlender.rfb_unittests.test_nurbs import NurbsEvalTest
+from RenderManForBlender.rfb_unittests.test_shadergraph import ShaderGraphTest
 
 classes = [
-    StringExprTest
+    StringExprTest,
+    NurbsEvalTest,
+    ShaderGraphTest
 ]
 
 def suite():
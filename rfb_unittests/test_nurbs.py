@@ -0,0 +1,27 @@
+import unittest
+from ..rman_translators import rman_nurbs_translator
+
+class FakeSpline:
+    def __init__(self, pnts, order, resolu, endpoint=False, bezier=False, cyclic=False):
+        self.point_count_u = pnts
+        self.order_u = order
+        self.resolution_u = resolu
+        self.use_endpoint_u = endpoint
+        self.use_bezier_u = bezier
+        self.use_cyclic_u = cyclic
+
+class NurbsEvalTest(unittest.TestCase):
+
+    @classmethod
+    def add_tests(self, suite):
+        suite.addTest(NurbsEvalTest('test_get_knots'))
+
+    # test cached knots match makeknots
+    def test_get_knots(self):
+        for spline in [FakeSpline(6, 4, 12), FakeSpline(6, 4, 12, endpoint=True),
+                       FakeSpline(7, 4, 12, bezier=True), FakeSpline(7, 3, 12, bezier=True),
+                       FakeSpline(5, 3, 12, cyclic=True)]:
+            knots = rman_nurbs_translator.get_knots(spline.point_count_u, spline.order_u,
+                                                    spline.use_endpoint_u, spline.use_bezier_u,
+                                                    cyclic=spline.use_cyclic_u)
+            self.assertEqual(knots.tolist(), rman_nurbs_translator.makeknots(spline))
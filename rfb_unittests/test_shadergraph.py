@@ -0,0 +1,66 @@
+import unittest
+from ..rfb_utils import shadergraph_utils
+
+class FakeLink:
+    def __init__(self, from_node, to_node, to_socket):
+        self.from_node = from_node
+        self.to_node = to_node
+        self.to_socket = to_socket
+
+class FakeSocket:
+    def __init__(self, name):
+        self.name = name
+        self.links = []
+
+class FakeNode:
+    def __init__(self, name, bl_idname='PxrNode', inputs=[], outputs=[], prop_meta=dict()):
+        self.name = name
+        self.bl_idname = bl_idname
+        self.inputs = {nm: FakeSocket(nm) for nm in inputs}
+        self.outputs = [FakeSocket(nm) for nm in outputs]
+        self.prop_meta = prop_meta
+
+def link(from_node, output, to_node, input):
+    to_socket = to_node.inputs[input]
+    socket = next(s for s in from_node.outputs if s.name == output)
+    socket.links.append(FakeLink(from_node, to_node, to_socket))
+
+class ShaderGraphTest(unittest.TestCase):
+
+    @classmethod
+    def add_tests(self, suite):
+        suite.addTest(ShaderGraphTest('test_vstruct_dependents'))
+        suite.addTest(ShaderGraphTest('test_vstruct_dependents_group'))
+
+    def _make_chain(self):
+        # pattern -> layer.baseColor (regular)
+        # layer -> mixer.baselayer (vstruct) -> surface.inputMaterial (vstruct)
+        vstruct_meta = {'baselayer': {'vstruct': True}, 'inputMaterial': {'type': 'vstruct'}}
+        pattern = FakeNode('pattern', outputs=['resultRGB'])
+        layer = FakeNode('layer', inputs=['baseColor'], outputs=['pxrMaterialOut'], 
+                         prop_meta={'baseColor': {'renderman_type': 'color'}})
+        reroute = FakeNode('reroute', bl_idname='NodeReroute', inputs=['Input'], outputs=['Output'])
+        mixer = FakeNode('mixer', inputs=['baselayer'], outputs=['pxrMaterialOut'], prop_meta=vstruct_meta)
+        surface = FakeNode('surface', inputs=['inputMaterial'], outputs=['bxdf_out'], prop_meta=vstruct_meta)
+        link(pattern, 'resultRGB', layer, 'baseColor')
+        link(layer, 'pxrMaterialOut', reroute, 'Input')
+        link(reroute, 'Output', mixer, 'baselayer')
+        link(mixer, 'pxrMaterialOut', surface, 'inputMaterial')
+        return pattern, layer, mixer, surface
+
+    # test nodes fed through vstruct connections are found
+    def test_vstruct_dependents(self):
+        pattern, layer, mixer, surface = self._make_chain()
+        dependents = shadergraph_utils.get_vstruct_dependents([layer])
+        self.assertEqual(set(dependents), set([mixer, surface]))
+
+        # regular connections don't make a dependent
+        self.assertEqual(shadergraph_utils.get_vstruct_dependents([pattern]), [])
+        self.assertEqual(shadergraph_utils.get_vstruct_dependents([surface]), [])
+
+    # test vstructs going into a node group can't be resolved
+    def test_vstruct_dependents_group(self):
+        pattern, layer, mixer, surface = self._make_chain()
+        group = FakeNode('group', bl_idname='ShaderNodeGroup', inputs=['Input'])
+        link(surface, 'bxdf_out', group, 'Input')
+        self.assertIsNone(shadergraph_utils.get_vstruct_dependents([layer]))
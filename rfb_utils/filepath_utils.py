@@ -4,9 +4,12 @@ import platform
 import sys
 import webbrowser
 import re
+import time
 from ..rfb_logger import rfb_log
 from .prefs_utils import get_pref
 
+__FRAME_FILES_INDEX__ = dict()
+
 def view_file(file_path):
     
     rman_editor = get_pref('rman_editor', '')
@@ -90,4 +93,54 @@ def filesystem_path(p):
 def get_real_path(path):
     if os.path.isabs(path):
         return os.path.realpath(filesystem_path(path))
-    return path
\ No newline at end of file
+    return path
+
+def get_frame_files(directory, ext, match=''):
+    '''Index the files in a directory by frame number. The frame number
+    is any zero padded number (at least 4 digits) in the file name. If more than one
+    file has the same frame number, the first one listed wins.
+
+    The index is cached, and only rebuilt when the modification time of
+    the directory changes, i.e.: files were added, removed or renamed. The
+    cache isn't used while the directory was modified in the last couple of
+    seconds, as some filesystems only store modification times to the second
+    or two, and files could still be getting written (ex: during a bake).
+
+    Args:
+        directory (str) - real path to the directory
+        ext (str) - only index files with this extension, ex: '.vdb'
+        match (str) - only index files that have this string in their name
+
+    Returns:
+        (dict) - frame number -> path to the file. Empty if the directory does not exist.
+    '''
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+    except OSError:
+        return dict()
+
+    key = (directory, ext, match)
+    recently_modified = (time.time_ns() - mtime) < 2 * 10**9
+    cached = __FRAME_FILES_INDEX__.get(key, None)
+    if cached and cached[0] == mtime and not recently_modified:
+        return cached[1]
+
+    frames = dict()
+    try:
+        for f in sorted(os.listdir(directory)):
+            if os.path.splitext(f)[1] != ext or match not in f:
+                continue
+            for m in re.finditer(r'\d+', f):
+                digits = m.group()
+                # frame numbers are padded to at least 4 digits
+                if len(digits) >= 4:
+                    frames.setdefault(int(digits), os.path.join(directory, f))
+    except OSError as e:
+        rfb_log().debug("Could not list directory %s: %s" % (directory, str(e)))
+        return dict()
+
+    if recently_modified:
+        __FRAME_FILES_INDEX__.pop(key, None)
+    else:
+        __FRAME_FILES_INDEX__[key] = (mtime, frames)
+    return frames
@@ -1,40 +1,56 @@
 import bpy
+import sys
 import numpy as np
 from .prefs_utils import get_pref
 from . import string_utils
 
+__SANITIZED_NAMES__ = dict()
+
+def get_sanitized_name(name):
+    '''Memoized string_utils.sanitize_node_name, for datablock names.
+
+    sanitize_node_name only replaces runs of whitespace and dots, so db names can be
+    built by joining the sanitized names of their datablocks with '|' and '-', which 
+    gives the same result as sanitizing the joined name.
+    '''
+    sanitized = __SANITIZED_NAMES__.get(name, None)
+    if sanitized is None:
+        sanitized = sys.intern(string_utils.sanitize_node_name(name))
+        __SANITIZED_NAMES__[name] = sanitized
+    return sanitized
+
 def get_db_name(ob, rman_type='', psys=None):
     db_name = ''    
 
     if psys:
-        db_name = '%s|%s-%s' % (ob.name_full, psys.name, psys.settings.type)
+        db_name = '%s|%s-%s' % (get_sanitized_name(ob.name_full), get_sanitized_name(psys.name), psys.settings.type)
 
     elif rman_type != '' and rman_type != 'NONE':
         if rman_type == 'META':
-            db_name = '%s-META' % (ob.name.split('.')[0])
+            db_name = '%s-META' % get_sanitized_name(ob.name.split('.')[0])
         elif rman_type == 'EMPTY':
-            db_name = '%s' % ob.name_full 
+            db_name = get_sanitized_name(ob.name_full)
         else:
-            db_name = '%s-%s' % (ob.name_full, rman_type)
+            db_name = '%s-%s' % (get_sanitized_name(ob.name_full), rman_type)
     elif isinstance(ob, bpy.types.Camera):
         db_name = ob.name_full
         return db_name
     elif isinstance(ob, bpy.types.Material):
         mat_name = ob.name_full.replace('.', '_')
-        db_name = '%s' % mat_name
+        db_name = get_sanitized_name(mat_name)
     elif isinstance(ob, bpy.types.Object):
         if ob.type == 'MESH':
-            db_name = '%s-MESH' % ob.name_full
+            db_name = '%s-MESH' % get_sanitized_name(ob.name_full)
         elif ob.type == 'LIGHT':
-            db_name = '%s-LIGHT' % ob.data.name_full
+            db_name = '%s-LIGHT' % get_sanitized_name(ob.data.name_full)
         elif ob.type == 'CAMERA':
             db_name = ob.name_full
             return db_name
         elif ob.type == 'EMPTY':
-            db_name = '%s' % ob.name_full  
+            db_name = get_sanitized_name(ob.name_full)
 
 
-    return string_utils.sanitize_node_name(db_name)
+    return db_name
 
 def get_group_db_name(ob_inst):
     if isinstance(ob_inst, bpy.types.DepsgraphObjectInstance):
@@ -42,17 +58,18 @@ def get_group_db_name(ob_inst):
             ob = ob_inst.instance_object
             parent = ob_inst.parent
             psys = ob_inst.particle_system
+            persistent_id = ob_inst.persistent_id
             if psys:
-                group_db_name = "%s|%s|%s|%d|%d" % (parent.name_full, ob.name_full, psys.name, ob_inst.persistent_id[1], ob_inst.persistent_id[0])
+                group_db_name = "%s|%s|%s|%d|%d" % (get_sanitized_name(parent.name_full), get_sanitized_name(ob.name_full), get_sanitized_name(psys.name), persistent_id[1], persistent_id[0])
             else:
-                group_db_name = "%s|%s|%d|%d" % (parent.name_full, ob.name_full, ob_inst.persistent_id[1], ob_inst.persistent_id[0])
+                group_db_name = "%s|%s|%d|%d" % (get_sanitized_name(parent.name_full), get_sanitized_name(ob.name_full), persistent_id[1], persistent_id[0])
         else:
             ob = ob_inst.object
-            group_db_name = "%s" % (ob.name_full)
+            group_db_name = get_sanitized_name(ob.name_full)
     else:
-        group_db_name = "%s" % (ob_inst.name_full)
+        group_db_name = get_sanitized_name(ob_inst.name_full)
 
-    return string_utils.sanitize_node_name(group_db_name)
+    return group_db_name
 
 def is_portal_light(ob):
     if ob.type != 'LIGHT':
@@ -72,9 +89,66 @@ def is_particle_instancer(psys, particle_settings=None):
 
     return False    
 
+class ObjectInstanceRecord(object):
+    '''
+    A stand-in for the bpy.types.DepsgraphObjectInstance of an object that is not
+    instanced by anything else, i.e.: the object itself. DepsgraphObjectInstances are
+    only valid while iterating depsgraph.object_instances, so this keeps what is needed 
+    to re-export the instance later, and reads the transform from the evaluated object.
+
+    Attributes:
+        original (bpy.types.Object) - the original object
+        object (bpy.types.Object) - the evaluated object, see evaluated()
+        name_full (str) - full name of the object
+        persistent_id (tuple) - persistent id of the instance
+        show_particles (bool) - whether particles of the object are shown
+        show_self (bool) - whether the object itself is shown
+    '''
+    is_instance = False
+    parent = None
+    instance_object = None
+    particle_system = None
+
+    def __init__(self, ob_inst):
+        self.original = ob_inst.object.original
+        self.object = ob_inst.object
+        self.name_full = ob_inst.object.name_full
+        self.persistent_id = tuple(ob_inst.persistent_id)
+        self.show_particles = ob_inst.show_particles
+        self.show_self = ob_inst.show_self
+
+    @property
+    def matrix_world(self):
+        return self.object.matrix_world
+
+    def evaluated(self, depsgraph):
+        '''Point this record to the evaluated object in depsgraph
+        '''
+        self.object = self.original.evaluated_get(depsgraph)
+        self.name_full = self.object.name_full
+        return self
+
 def get_meta_family(ob):
     return ob.name.split('.')[0]
 
+def get_meta_families():
+    '''Index all of the metaballs in the file by their family name
+
+    Each metaball datablock is listed once, paired with the first object that
+    uses it, since its elements don't know which object they belong to.
+
+    Returns:
+        (dict) - family name -> list of (bpy.types.Object, bpy.types.MetaBall)
+    '''
+    families = dict()
+    seen = set()
+    for ob in bpy.data.objects:
+        if ob.type != 'META' or ob.data in seen:
+            continue
+        seen.add(ob.data)
+        families.setdefault(get_meta_family(ob), []).append((ob, ob.data))
+    return families
+
 def is_subd_last(ob):
     return ob.modifiers and \
         ob.modifiers[len(ob.modifiers) - 1].type == 'SUBSURF'
@@ -140,6 +214,132 @@ def is_transforming(ob, recurse=False):
             transforming = ob.parent.data.use_path
     return transforming
 
+def get_shared_geometry_key(ob, rman_type=''):
+    '''Return a hashable key that identifies the geometry of this object, so that
+    objects using the same mesh datablock can share a single prototype. Returns None
+    if the evaluated geometry of this object can differ from other users of its
+    datablock (ex: it has modifiers or is deforming).
+
+    Arguments:
+        ob (bpy.types.Object) - the evaluated object
+        rman_type (str) - the renderman type for this object
+
+    Returns:
+        (tuple) - the key, or None if the geometry cannot be shared
+    '''
+    if rman_type != 'MESH' or ob.type != 'MESH':
+        return None
+    mesh = ob.original.data
+    if mesh is None or mesh.users < 2:
+        return None
+    if ob.modifiers or ob.is_instancer or not ob.show_instancer_for_render:
+        return None
+    if _is_deforming_(ob) or ob.renderman.motion_segments_override:
+        return None
+
+    # material slots linked to the object, and vertex groups, are
+    # stored per object, so we can't share these
+    for slot in ob.material_slots:
+        if slot.link == 'OBJECT':
+            return None
+    for p in mesh.renderman.prim_vars:
+        if p.data_source == 'VERTEX_GROUP':
+            return None
+
+    # object primvars end up on the geometry node, so they need to match too
+    rm = ob.renderman
+    primvars = []
+    for prop_name, meta in rm.prop_meta.items():
+        if 'primvar' not in meta:
+            continue
+        val = getattr(rm, prop_name)
+        if hasattr(val, '__getitem__') and not isinstance(val, str):
+            val = tuple(val)
+        primvars.append((prop_name, val))
+
+    return (mesh, tuple(primvars))
+
+def _is_animated_(ob, seen):
+    # Check if anything that can change the transform or shape of ob from frame
+    # to frame is animated or simulated. This follows the parent chain, and the
+    # objects and collections that modifiers and curves take as operands.
+    time_dependent_modifiers = ['BUILD', 'CLOTH', 'COLLISION', 'DYNAMIC_PAINT', 'EXPLODE',
+                                'FLUID', 'MESH_CACHE', 'MESH_SEQUENCE_CACHE', 'NODES', 'OCEAN',
+                                'PARTICLE_INSTANCE', 'PARTICLE_SYSTEM', 'SOFT_BODY', 'SURFACE', 'WAVE']
+    if ob is None or ob in seen:
+        return False
+    seen.add(ob)
+
+    if ob.animation_data or ob.constraints or ob.rigid_body or ob.rigid_body_constraint:
+        return True
+    if ob.particle_systems or _is_deforming_(ob):
+        return True
+    if ob.data is not None and getattr(ob.data, 'animation_data', None):
+        return True
+
+    if ob.parent:
+        if ob.parent.type == 'CURVE' and ob.parent.data and ob.parent.data.use_path:
+            return True
+        if _is_animated_(ob.parent, seen):
+            return True
+
+    for mod in ob.modifiers:
+        if mod.type in time_dependent_modifiers:
+            return True
+        # modifiers can also depend on other objects (ex: boolean, array offset)
+        for attr in ['object', 'offset_object', 'mirror_object', 'target']:
+            other = getattr(mod, attr, None)
+            if isinstance(other, bpy.types.Object) and _is_animated_(other, seen):
+                return True
+        coll = getattr(mod, 'collection', None)
+        if isinstance(coll, bpy.types.Collection):
+            for other in coll.all_objects:
+                if _is_animated_(other, seen):
+                    return True
+
+    if ob.type in ['CURVE', 'FONT'] and ob.data is not None:
+        for attr in ['bevel_object', 'taper_object']:
+            other = getattr(ob.data, attr, None)
+            if other is not None and _is_animated_(other, seen):
+                return True
+
+    return False
+
+def is_static_geometry(ob):
+    '''Check if the geometry and transform of this object cannot change from frame
+    to frame. This is a conservative check: nothing on the object, its parents, its
+    data, the objects its modifiers and curves depend on, or its materials is animated,
+    and none of them have constraints, rigid bodies, particles or modifiers that could 
+    change over time.
+
+    Arguments:
+        ob (bpy.types.Object) - the object
+
+    Returns:
+        (bool) - True if the object is static
+    '''
+    if ob.type not in ['MESH', 'CURVE', 'SURFACE', 'FONT']:
+        return False
+    if _detect_primitive_(ob) not in ['MESH', 'CURVE', 'NURBS', 'POINTS', 'QUADRIC']:
+        return False
+    if ob.is_instancer:
+        return False
+    if ob.parent and ob.parent.type == 'EMPTY':
+        return False
+    if ob.data is None:
+        return False
+    if _is_animated_(ob, set()):
+        return False
+
+    for slot in ob.material_slots:
+        mat = slot.material
+        if not mat:
+            continue
+        if mat.animation_data or (mat.node_tree and mat.node_tree.animation_data):
+            return False
+
+    return True
+
 def _detect_primitive_(ob):
 
     if isinstance(ob, bpy.types.ParticleSystem):
@@ -205,14 +405,10 @@ def _get_used_materials_(ob):
     if ob.type == 'MESH' and len(ob.data.materials) > 0:
         if len(ob.data.materials) == 1:
             return [ob.data.materials[0]]
-        mat_ids = []
         mesh = ob.data
-        num_materials = len(ob.data.materials)
-        for p in mesh.polygons:
-            if p.material_index not in mat_ids:
-                mat_ids.append(p.material_index)
-            if num_materials == len(mat_ids):
-                break
+        material_ids = np.zeros(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get('material_index', material_ids)
+        mat_ids = np.unique(material_ids).tolist()
         return [mesh.materials[i] for i in mat_ids]
     else:
         return [ob.active_material]     
@@ -222,36 +418,50 @@ def _get_mesh_points_(mesh):
     P = np.zeros(nvertices*3, dtype=np.float32)
     mesh.vertices.foreach_get('co', P)
     P = np.reshape(P, (nvertices, 3))
-    return P.tolist()
+    return P
+
+def _get_mesh_velocity_(ob, mesh):
+    # Get the velocity attribute used for velocity deformation blur,
+    # as an (N,3) array. Returns None if the mesh doesn't have one.
+    attributes = getattr(mesh, 'attributes', None)
+    if attributes is None:
+        return None
+    attr = attributes.get(ob.renderman.deform_velocity_attr, None)
+    if not attr or attr.domain != 'POINT' or attr.data_type != 'FLOAT_VECTOR':
+        return None
+    nvertices = len(mesh.vertices)
+    velocity = np.zeros(nvertices*3, dtype=np.float32)
+    attr.data.foreach_get('vector', velocity)
+    velocity = np.reshape(velocity, (nvertices, 3))
+    return velocity
 
 def _get_mesh_(mesh, get_normals=False):
+    # Everything is returned as contiguous NumPy arrays. Use
+    # scenegraph_utils.set_primvar_bulk_data to hand these over
+    # to the primvar setters.
 
     P = _get_mesh_points_(mesh)
     N = []    
 
     npolygons = len(mesh.polygons)
-    fastnvertices = np.zeros(npolygons, dtype=np.int)
-    mesh.polygons.foreach_get('loop_total', fastnvertices)
-    nverts = fastnvertices.tolist()
+    nverts = np.zeros(npolygons, dtype=np.int32)
+    mesh.polygons.foreach_get('loop_total', nverts)
 
     loops = len(mesh.loops)
-    fastvertices = np.zeros(loops, dtype=np.int)
-    mesh.loops.foreach_get('vertex_index', fastvertices)
-    verts = fastvertices.tolist()
+    verts = np.zeros(loops, dtype=np.int32)
+    mesh.loops.foreach_get('vertex_index', verts)
 
     if get_normals:
-        fastsmooth = np.zeros(npolygons, dtype=np.int)
+        fastsmooth = np.zeros(npolygons, dtype=bool)
         mesh.polygons.foreach_get('use_smooth', fastsmooth)
-        if mesh.use_auto_smooth or True in fastsmooth:
+        if mesh.use_auto_smooth or fastsmooth.any():
             mesh.calc_normals_split()
             fastnormals = np.zeros(loops*3, dtype=np.float32)
             mesh.loops.foreach_get('normal', fastnormals)
-            fastnormals = np.reshape(fastnormals, (loops, 3))
-            N = fastnormals.tolist()            
+            N = np.reshape(fastnormals, (loops, 3))
         else:            
             fastnormals = np.zeros(npolygons*3, dtype=np.float32)
             mesh.polygons.foreach_get('normal', fastnormals)
-            fastnormals = np.reshape(fastnormals, (npolygons, 3))
-            N = fastnormals.tolist()
+            N = np.reshape(fastnormals, (npolygons, 3))
 
     return (nverts, verts, P, N)
\ No newline at end of file
@@ -1,74 +1,128 @@
-from mathutils import Vector
+from . import scenegraph_utils
+import numpy as np
 
 def valid_particle(pa, valid_frames):
     return pa.die_time >= valid_frames[-1] and pa.birth_time <= valid_frames[0]
 
-def get_particles(ob, psys, inv_mtx, frame, valid_frames=None, get_next_P=False, get_width=True):
-    P = []
+class ParticlesSnapshot(object):
+    '''
+    A columnar snapshot of the particles in a particle system. Each particle attribute
+    is read once, for all particles, with foreach_get, the first time it is asked for.
+    The valid particle mask for a set of frames is also only built once, so that P, width
+    and all of the primvars can be served from the same snapshot.
+
+    Attributes:
+        psys (bpy.types.ParticleSystem) - the particle system
+        count (int) - number of particles
+    '''
+
+    __COLUMNS__ = {
+        'location': 3,
+        'velocity': 3,
+        'angular_velocity': 3,
+        'rotation': 4,
+        'size': 1,
+        'birth_time': 1,
+        'die_time': 1,
+        'lifetime': 1
+    }
+
+    def __init__(self, psys):
+        self.psys = psys
+        self.count = len(psys.particles)
+        self._columns = dict()
+        self._masks = dict()
+        self._alive = None
+
+    def get(self, name):
+        '''Get a particle attribute as an (N,) or (N,width) array.'''
+        col = self._columns.get(name, None)
+        if col is None:
+            width = self.__COLUMNS__[name]
+            col = np.zeros(self.count * width, dtype=np.float32)
+            self.psys.particles.foreach_get(name, col)
+            if width > 1:
+                col = np.reshape(col, (self.count, width))
+            self._columns[name] = col
+        return col
+
+    def get_mask(self, valid_frames):
+        '''Get the mask of particles that are valid for all of valid_frames (see valid_particle).'''
+        key = (valid_frames[0], valid_frames[-1])
+        mask = self._masks.get(key, None)
+        if mask is None:
+            mask = (self.get('die_time') >= valid_frames[-1]) & (self.get('birth_time') <= valid_frames[0])
+            self._masks[key] = mask
+        return mask
+
+    def get_alive(self):
+        '''Get the mask of particles whose alive_state is ALIVE.'''
+        if self._alive is None:
+            # alive_state is an enum, which foreach_get can't read
+            self._alive = np.array([pa.alive_state == 'ALIVE' for pa in self.psys.particles], dtype=bool)
+        return self._alive
+
+def get_particles(ob, psys, inv_mtx, frame, valid_frames=None, get_next_P=False, get_width=True, snapshot=None):
+    '''Get the particle positions (in object space), the positions at the next
+    frame (using velocity) and widths as arrays.
+
+    Arguments:
+        snapshot (ParticlesSnapshot) - snapshot to read from. One is created if not given.
+    '''
     next_P = []
     width = []
 
     valid_frames = (frame,
                     frame) if valid_frames is None else valid_frames
-    
-    for pa in [p for p in psys.particles if valid_particle(p, valid_frames)]:
-        pt = inv_mtx @ pa.location
-        P.append(pt)
+    if snapshot is None:
+        snapshot = ParticlesSnapshot(psys)
+    mask = snapshot.get_mask(valid_frames)
+
+    mtx = np.array(inv_mtx, dtype=np.float32)
+    location = snapshot.get('location')[mask]
+    P = location @ mtx[:3, :3].T + mtx[:3, 3]
         
-        if get_next_P:
-            # calculate the point for the next frame using velocity
-            vel = Vector(pa.velocity / pa.lifetime )
-            next_P.append( inv_mtx @ (Vector(pa.location) + vel))
-
-        if get_width:
-            if pa.alive_state != 'ALIVE':
-                width.append(0.0)
-            else:
-                width.append(pa.size)
+    if get_next_P:
+        # calculate the point for the next frame using velocity
+        vel = snapshot.get('velocity')[mask] / snapshot.get('lifetime')[mask][:, None]
+        next_P = (location + vel) @ mtx[:3, :3].T + mtx[:3, 3]
+
+    if get_width:
+        width = np.where(snapshot.get_alive()[mask], snapshot.get('size')[mask], 0.0).astype(np.float32)
+
     return (P, next_P, width)    
 
-def get_primvars_particle(primvar, frame, psys, subframes, sample):
+def get_primvars_particle(primvar, frame, psys, subframes, sample, snapshot=None):
     rm = psys.settings.renderman
+    if snapshot is None:
+        snapshot = ParticlesSnapshot(psys)
+    mask = None
 
     for p in rm.prim_vars:
-        pvars = []
+        if mask is None:
+            mask = snapshot.get_mask(subframes)
 
         if p.data_source in ('VELOCITY', 'ANGULAR_VELOCITY'):
             if p.data_source == 'VELOCITY':
-                for pa in \
-                        [p for p in psys.particles if valid_particle(p, subframes)]:
-                    pvars.append(pa.velocity)
+                pvars = snapshot.get('velocity')[mask]
             elif p.data_source == 'ANGULAR_VELOCITY':
-                for pa in \
-                        [p for p in psys.particles if valid_particle(p, subframes)]:
-                    pvars.append(pa.angular_velocity)
+                pvars = snapshot.get('angular_velocity')[mask]
 
-            primvar.SetVectorDetail(p.name, pvars, "vertex", sample)
+            scenegraph_utils.set_primvar_bulk_data(primvar, 'SetVectorDetail', p.name, pvars, "vertex", sample)
 
         elif p.data_source in \
                 ('SIZE', 'AGE', 'BIRTH_TIME', 'DIE_TIME', 'LIFE_TIME', 'ID'):
             if p.data_source == 'SIZE':
-                for pa in \
-                        [p for p in psys.particles if valid_particle(p, subframes)]:
-                    pvars.append(pa.size)
+                pvars = snapshot.get('size')[mask]
             elif p.data_source == 'AGE':
-                for pa in \
-                        [p for p in psys.particles if valid_particle(p, subframes)]:
-                    pvars.append((frame - pa.birth_time) / pa.lifetime)
+                pvars = (frame - snapshot.get('birth_time')[mask]) / snapshot.get('lifetime')[mask]
             elif p.data_source == 'BIRTH_TIME':
-                for pa in \
-                        [p for p in psys.particles if valid_particle(p, subframes)]:
-                    pvars.append(pa.birth_time)
+                pvars = snapshot.get('birth_time')[mask]
             elif p.data_source == 'DIE_TIME':
-                for pa in \
-                        [p for p in psys.particles if valid_particle(p, subframes)]:
-                    pvars.append(pa.die_time)
+                pvars = snapshot.get('die_time')[mask]
             elif p.data_source == 'LIFE_TIME':
-                for pa in \
-                        [p for p in psys.particles if valid_particle(p, subframes)]:
-                    pvars.append(pa.lifetime)
+                pvars = snapshot.get('lifetime')[mask]
             elif p.data_source == 'ID':
-                pvars = [id for id, p in psys.particles.items(
-                ) if valid_particle(p, subframes)]
+                pvars = np.flatnonzero(mask).astype(np.float32)
             
-            primvar.SetFloatDetail(p.name, pvars, "vertex", sample)  
\ No newline at end of file
+            scenegraph_utils.set_primvar_bulk_data(primvar, 'SetFloatDetail', p.name, pvars.astype(np.float32), "vertex", sample)
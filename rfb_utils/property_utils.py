@@ -644,6 +644,34 @@ def set_array_rixparams(node, rman_sg_node, mat_name, bl_prop_info, prop_name, p
     else:
         set_rix_param(params, param_type, param_name, val_array, is_reference=False, is_array=True, array_len=len(val_array))                               
 
+def get_node_param_values(node):
+    '''Return the current values of the parameters of a shading node. Compare
+    against a later call to find out if any of them changed.
+
+    Args:
+        node (bpy.types.Node) - the shading node
+
+    Returns:
+        (tuple) - the parameter values, or None if the node has parameters whose exported
+                  value is not just the property value (textures, ramps, arrays and OSL
+                  parameters), and so always needs to be exported
+    '''
+    if node.bl_label == "PxrOSL":
+        return None
+
+    values = []
+    for prop_name, meta in node.prop_meta.items():
+        param_type = meta.get('renderman_type', '')
+        if param_type in ['array', 'colorramp', 'floatramp']:
+            return None
+        if param_type == 'string' and shadergraph_utils.is_texture_property(prop_name, meta):
+            return None
+        prop = getattr(node, prop_name, None)
+        if hasattr(prop, '__len__') and not isinstance(prop, str):
+            prop = tuple(prop)
+        values.append(prop)
+    return tuple(values)
+
 def set_node_rixparams(node, rman_sg_node, params, ob=None, mat_name=None, group_node=None):
     # If node is OSL node get properties from dynamic location.
     if node.bl_label == "PxrOSL":
@@ -1,3 +1,11 @@
+from ..rfb_logger import rfb_log
+import numpy as np
+
+# Whether the RtPrimVar setters accept objects supporting the buffer protocol
+# (ex: NumPy arrays). We flip this off the first time a setter rejects an array,
+# and fallback to passing Python lists from then on.
+__RMAN_BUFFER_PRIMVARS__ = True
+
 def set_material(sg_node, sg_material_node):
     '''Sets the material on a scenegraph group node and sets the materialid
     user attribute at the same time.
@@ -37,4 +45,35 @@ def export_vol_aggregate(bl_scene, primvar, ob):
                 break
 
     if vol_aggregate_group:
-        primvar.SetStringArray("volume:aggregate", vol_aggregate_group, len(vol_aggregate_group))
\ No newline at end of file
+        primvar.SetStringArray("volume:aggregate", vol_aggregate_group, len(vol_aggregate_group))
+
+def set_primvar_bulk_data(primvar, setter, name, data, *args):
+    '''Set a primvar using a NumPy array, without converting the array to a Python list
+    first. If the RtPrimVar setter does not accept buffers, the array is converted
+    to a list instead.
+
+    Arguments:
+        primvar (RtPrimVar) - the primvar list to set the data on
+        setter (str) - name of the RtPrimVar setter to call, ex: 'SetPointDetail'
+        name (str) - name of the primvar
+        data (numpy.ndarray) - array with the primvar data. It is converted to a C contiguous
+                               array of int32 for the integer setters, and float32 for all others
+        args - any remaining arguments for the setter, ex: detail and time sample
+    '''
+    global __RMAN_BUFFER_PRIMVARS__
+
+    # the setters read the buffer as raw 32-bit values, so make sure
+    # the data is laid out that way
+    dtype = np.int32 if 'Integer' in setter else np.float32
+    data = np.ascontiguousarray(data, dtype=dtype)
+
+    func = getattr(primvar, setter)
+    if __RMAN_BUFFER_PRIMVARS__:
+        try:
+            func(name, data, *args)
+            return
+        except (TypeError, ValueError) as err:
+            rfb_log().debug("RtPrimVar.%s does not accept buffers, falling back to lists: %s" % (setter, str(err)))
+            __RMAN_BUFFER_PRIMVARS__ = False
+
+    func(name, data.tolist(), *args)
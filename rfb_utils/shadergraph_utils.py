@@ -344,6 +344,65 @@ def find_node_input(node, name):
 
     return None
 
+def get_nodetree_signature(nt):
+    '''Return a description of the topology of a node tree: its nodes, and the links
+    between them, including the node trees of any group nodes. Parameter values are
+    not part of the signature. Compare against a later call to find out if any nodes
+    or links were added, removed or renamed.
+
+    Args:
+        nt (bpy.types.NodeTree) - the node tree
+
+    Returns:
+        (tuple) - the signature
+    '''
+    nodes = []
+    for node in nt.nodes:
+        group_signature = None
+        if node.bl_idname == 'ShaderNodeGroup' and node.node_tree:
+            group_signature = (node.node_tree.name, get_nodetree_signature(node.node_tree))
+        nodes.append((node.name, node.bl_idname, getattr(node, 'shadercode', None),
+                      getattr(node, 'solo_node_name', None), group_signature))
+    links = [(link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier)
+             for link in nt.links]
+    return (tuple(nodes), tuple(links))
+
+def get_vstruct_dependents(changed_nodes):
+    '''Find the nodes that have a vstruct input fed by any of changed_nodes, directly
+    or through other vstruct connections. The connections and values these nodes export
+    for their vstruct members depend on the parameters of the upstream nodes.
+
+    Args:
+        changed_nodes (list) - the nodes whose parameters changed
+
+    Returns:
+        (list) - the dependent nodes, or None if the dependents can't be determined
+                 because a changed node feeds a node group
+    '''
+    dependents = []
+    seen = set(changed_nodes)
+    stack = list(changed_nodes)
+    while stack:
+        node = stack.pop()
+        for socket in node.outputs:
+            for link in socket.links:
+                to_node = link.to_node
+                if to_node in seen:
+                    continue
+                if to_node.bl_idname == 'NodeReroute':
+                    # follow the reroute, without counting it as a dependent
+                    seen.add(to_node)
+                    stack.append(to_node)
+                    continue
+                if to_node.bl_idname in ['ShaderNodeGroup', 'NodeGroupOutput']:
+                    return None
+                meta = getattr(to_node, 'prop_meta', dict()).get(link.to_socket.name, None)
+                if meta and (meta.get('vstruct', False) is True or meta.get('type', '') == 'vstruct'):
+                    seen.add(to_node)
+                    dependents.append(to_node)
+                    stack.append(to_node)
+    return dependents
+
 # walk the tree for nodes to export
 def gather_nodes(node):
     nodes = []
@@ -647,6 +647,181 @@ class RmanRender(object):
 
         return True   
 
+    def _export_rib_sequence_parallel(self, depsgraph, num_procs):
+        '''Write RIB files for the frame range using several background Blender
+        processes. The frame range is split into one chunk of consecutive frames 
+        per process. Each process loads a copy of the scene and writes its chunk, 
+        the same way start_external_render does.
+
+        Returns:
+            (bool) - True if RIB was written for every frame
+        '''
+
+        bl_scene = depsgraph.scene_eval
+        rm = bl_scene.renderman
+        frames = list(range(bl_scene.frame_start, bl_scene.frame_end + 1))
+        num_procs = min(num_procs, len(frames))
+        chunk_size = -(-len(frames) // num_procs)
+        chunks = [frames[i:i+chunk_size] for i in range(0, len(frames), chunk_size)]
+
+        string_utils.set_var('scene', bl_scene.name.replace(' ', '_'))
+        string_utils.set_var('layer', depsgraph.view_layer.name.replace(' ', '_'))
+        rib_outputs = dict()
+        for frame in frames:
+            rib_outputs[frame] = string_utils.expand_string(rm.path_rib_output, 
+                                                            frame=frame, 
+                                                            asFilePath=True)
+
+        # Save a copy of the scene for the workers to load. Keep it next to the
+        # .blend file, so that relative paths and the <blend_dir> token still work.
+        if bpy.data.filepath:
+            stash_dir = os.path.dirname(bpy.data.filepath)
+            bl_filename = os.path.splitext(os.path.basename(bpy.data.filepath))[0]
+        else:
+            stash_dir = string_utils.expand_string('<OUT>', asFilePath=True)
+            bl_filename = 'UNTITLED'
+        _id = 'pid%s_%d' % (str(os.getpid()), int(time.time()))
+        stash_file = os.path.join(stash_dir, '_%s%s_rib.blend' % (bl_filename, _id))
+        scene = bl_scene.original
+        # RIB files written after this are from this export. Allow some slack, 
+        # as some filesystems only store modification times to the second or two
+        time_start = time.time()
+        mtime_start = time_start - 2.0
+        scene.renderman.blend_token = bl_filename
+        try:
+            bpy.ops.wm.save_as_mainfile(filepath=stash_file, copy=True)
+        except Exception as e:
+            rfb_log().error('Could not write scene copy %s: %s' % (stash_file, str(e)))
+            return False
+        finally:
+            scene.renderman.blend_token = ''
+
+        def frame_done(frame):
+            rib_output = rib_outputs[frame]
+            return os.path.exists(rib_output) and os.path.getmtime(rib_output) >= mtime_start
+
+        rfb_log().info("Writing RIB for %d frames using %d processes..." % (len(frames), len(chunks)))
+        workers = []
+        log_files = []
+        cancelled = False
+        failed = []
+        try:
+            for chunk in chunks:
+                expr = 'import bpy\n'
+                expr += 'scene = bpy.data.scenes[%r]\n' % scene.name
+                expr += 'rm = scene.renderman\n'
+                expr += 'rm.enable_external_rendering = True\n'
+                expr += 'rm.external_animation = True\n'
+                expr += 'rm.queuing_system = "none"\n'
+                expr += 'rm.rib_export_processes = 1\n'
+                expr += 'scene.frame_start = %d\n' % chunk[0]
+                expr += 'scene.frame_end = %d\n' % chunk[-1]
+                if self.rman_scene.rib_static_archive:
+                    # the static objects archive has already been written
+                    expr += 'from %s.rman_render import RmanRender\n' % __package__
+                    expr += 'RmanRender.get_rman_render().rman_scene.rib_static_archive = %r\n' % self.rman_scene.rib_static_archive
+                expr += 'bpy.ops.render.render(scene=%r, layer=%r)\n' % (scene.name, depsgraph.view_layer.name)
+                args = [bpy.app.binary_path, '-b', stash_file, '--python-expr', expr]
+
+                log_file = os.path.join(stash_dir, '_%s%s_rib_%d.log' % (bl_filename, _id, chunk[0]))
+                log_files.append(log_file)
+                log = open(log_file, 'w')
+                try:
+                    proc = subprocess.Popen(args, stdout=log, stderr=subprocess.STDOUT)
+                except:
+                    log.close()
+                    raise
+                workers.append((chunk, proc, log, log_file))
+
+            # each worker writes its frames in order, so for progress we only need to
+            # check for the next frame of each chunk. Every frame is checked once the
+            # workers are done.
+            progress = [0] * len(workers)
+            while any(proc.poll() is None for chunk, proc, log, log_file in workers):
+                if self.bl_engine.test_break():
+                    cancelled = True
+                    break
+                for i, (chunk, proc, log, log_file) in enumerate(workers):
+                    while progress[i] < len(chunk) and frame_done(chunk[progress[i]]):
+                        progress[i] += 1
+                num_done = sum(progress)
+                self.bl_engine.update_stats('', 'Writing RIB (%d/%d frames)' % (num_done, len(frames)))
+                self.bl_engine.update_progress(num_done / len(frames))
+                time.sleep(0.5)
+
+            if not cancelled:
+                # collect the results from each worker
+                for chunk, proc, log, log_file in workers:
+                    proc.wait()
+                    log.close()
+                    missing = [f for f in chunk if not frame_done(f)]
+                    if missing:
+                        failed.append((chunk, missing))
+                        with open(log_file, 'r') as f:
+                            output = f.read()
+                        rfb_log().error('RIB export failed for frames %d-%d (exit code %d). Missing frames: %s\n%s' % 
+                                        (chunk[0], chunk[-1], proc.returncode, str(missing), output[-4000:]))
+        finally:
+            for chunk, proc, log, log_file in workers:
+                if proc.poll() is None:
+                    proc.terminate()
+                    proc.wait()
+                log.close()
+            for path in log_files + [stash_file]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+        if cancelled:
+            rfb_log().info("RIB export cancelled.")
+            return False
+        if failed:
+            num_missing = sum([len(missing) for chunk, missing in failed])
+            self.bl_engine.report({'ERROR'}, 'Export failed: RIB was not written for %d frame(s). See the log for details.' % num_missing)
+            return False
+
+        self.bl_engine.update_progress(1.0)
+        rfb_log().info("Finished writing RIB. Total time: %s" % string_utils._format_time_(time.time() - time_start))
+        return True
+
+    def _export_rib_static_archive(self, depsgraph, rib_options):
+        '''Write the objects that don't change over the frame range into a single 
+        RIB archive, and tell rman_scene to reference it from each frame.
+
+        Returns:
+            (bool) - False if the archive could not be written
+        '''
+        bl_scene = depsgraph.scene_eval
+        rm = bl_scene.renderman
+        config = rman.Types.RtParamList()
+        render_config = rman.Types.RtParamList()
+
+        self.sg_scene = self.sgmngr.CreateScene(config, render_config, self.stats_mgr.rman_stats_session) 
+        try:
+            self.rman_is_exporting = True
+            num_static = self.rman_scene.export_for_rib_static_archive(depsgraph, self.sg_scene)
+            if num_static > 0:
+                rib_output = string_utils.expand_string(rm.path_rib_output, 
+                                                        frame=bl_scene.frame_start, 
+                                                        asFilePath=True)
+                archive = os.path.join(os.path.dirname(rib_output), 
+                                       string_utils.expand_string('<blend>.<scene>.<layer>.static.rib'))
+                rfb_log().debug("Writing %d static objects to RIB archive: %s" % (num_static, archive))
+                self.sg_scene.Render("rib %s -archive %s" % (archive, rib_options))
+                self.rman_scene.rib_static_archive = archive
+        except Exception as e:      
+            self.bl_engine.report({'ERROR'}, 'Export failed: %s' % str(e))
+            rfb_log().error('Export Failed:\n%s' % traceback.format_exc())
+            self.rman_scene.rib_static_archive = None
+            return False
+        finally:
+            self.rman_is_exporting = False
+            self.sgmngr.DeleteScene(self.sg_scene)
+            self.sg_scene = None
+
+        return True
+
     def start_external_render(self, depsgraph):  
 
         bl_scene = depsgraph.scene_eval
@@ -664,7 +839,27 @@ class RmanRender(object):
         if rib_format == "ascii":
             rib_options += " -indent"
 
-        if rm.external_animation:
+        if rm.external_animation and rm.rib_static_archive and not self.rman_scene.rib_static_archive:
+            if not self._export_rib_static_archive(depsgraph, rib_options):
+                self.stop_render(stop_draw_thread=False)
+                self.del_bl_engine()
+                return False
+
+        if rm.external_animation and rm.rib_export_processes > 1 and bl_scene.frame_end > bl_scene.frame_start:
+            if not self._export_rib_sequence_parallel(depsgraph, rm.rib_export_processes):
+                self.rman_scene.rib_static_archive = None
+                self.stop_render(stop_draw_thread=False)
+                self.del_bl_engine()
+                return False
+
+            # the spooler still needs to know about the scene
+            self.rman_scene.bl_scene = bl_scene
+            self.rman_scene.bl_view_layer = depsgraph.view_layer
+            self.rman_scene.bl_frame_current = bl_scene.frame_current
+            self.rman_scene._find_renderman_layer()
+            self.rman_scene.external_render = True
+
+        elif rm.external_animation:
             original_frame = bl_scene.frame_current
             rfb_log().debug("Writing to RIB...")             
             for frame in range(bl_scene.frame_start, bl_scene.frame_end + 1):
@@ -686,6 +881,7 @@ class RmanRender(object):
                 except Exception as e:      
                     self.bl_engine.report({'ERROR'}, 'Export failed: %s' % str(e))
                     rfb_log().error('Export Failed:\n%s' % traceback.format_exc())
+                    self.rman_scene.rib_static_archive = None
                     self.stop_render(stop_draw_thread=False)
                     self.del_bl_engine()
                     return False                       
@@ -726,6 +922,7 @@ class RmanRender(object):
         if rm.queuing_system != 'none':
             spooler = rman_spool.RmanSpool(self, self.rman_scene, depsgraph)
             spooler.batch_render()
+        self.rman_scene.rib_static_archive = None
         self.rman_running = False
         self.sg_scene = None
         self.del_bl_engine()
@@ -924,6 +1121,7 @@ class RmanRender(object):
 
         try:
             self.rman_scene_sync.sg_scene = self.sg_scene
+            self.rman_scene_sync.pending_updates.clear()
             rfb_log().info("Parsing scene...")        
             self.rman_is_exporting = True
             self.start_export_stats_thread()        
@@ -1344,8 +1542,16 @@ class RmanRender(object):
        
     def update_scene(self, context, depsgraph):
         if self.rman_interactive_running:
-            self.rman_scene_sync.update_scene(context, depsgraph)
+            # updates are coalesced, and committed at most once every
+            # rman_ipr_update_interval seconds. Anything left pending is
+            # committed from update_view
+            self.rman_scene_sync.queue_updates(depsgraph)
+            if not self.rman_scene_sync.commit_updates(context, depsgraph):
+                self.bl_engine.tag_redraw()
 
     def update_view(self, context, depsgraph):
         if self.rman_interactive_running:
+            if self.rman_scene_sync.has_pending_updates():
+                if not self.rman_scene_sync.commit_updates(context, depsgraph):
+                    self.bl_engine.tag_redraw()
             self.rman_scene_sync.update_view(context, depsgraph)
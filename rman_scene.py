@@ -45,10 +45,12 @@ from . import rman_constants
 
 from .rfb_logger import rfb_log
 from .rman_sg_nodes.rman_sg_node import RmanSgNode
+from .rman_sg_nodes.rman_sg_node_dict import RmanSgNodeDict
 
 import bpy
 import os
 import sys
+import numpy as np
 
 class RmanScene(object):
     '''
@@ -70,16 +72,29 @@ class RmanScene(object):
         external_render (bool) - whether we are exporting for external (RIB) renders
         is_viewport_render (bool) - whether we are rendering into Blender's viewport
         scene_solo_light (bool) - user has solo'd a light (all other lights are muted)
-        rman_materials (dict) - dictionary of scene's materials
-        rman_objects (dict) - dictionary of all objects
+        rman_materials (RmanSgNodeDict) - dictionary of scene's materials
+        rman_objects (RmanSgNodeDict) - dictionary of all objects
         rman_translators (dict) - dictionary of all RmanTranslator(s)
         rman_particles (dict) - dictionary of all particle systems used
         rman_cameras (dict) - dictionary of all cameras in the scene
         obj_hash (dict) - dictionary of hashes to objects ( for object picking )
         moving_objects (dict) - dictionary of objects that are moving/deforming in the scene
-        processed_obs (dict) - dictionary of objects already processed
+        processed_obs (set) - set of objects already processed
+        rman_shared_geometry (dict) - dictionary of geometry prototypes shared between objects, 
+                            keyed by object_utils.get_shared_geometry_key
         motion_steps (set) - the full set of motion steps for the scene, including 
                             overrides from individual objects
+        rib_static_archive (str) - path to a RIB archive holding the static objects of a RIB 
+                            sequence export. When set, static objects are not exported and 
+                            the archive is referenced instead. This is set by RmanRender.
+        rib_static_obs (set) - the objects referenced from rib_static_archive in the current export
+        instanced_obs (set) - objects that are instanced by other objects (IPR only)
+        instance_records (dict) - object -> ObjectInstanceRecord, for the instance of an object that
+                            is the object itself (IPR only)
+        material_users (dict) - material -> set of objects whose data uses the material (IPR only)
+        object_materials (dict) - object -> set of materials its data uses (IPR only)
+        meta_families (dict) - index of metaball families, keyed by family name. Built on first
+                            use by get_meta_family_members, set to None to rebuild it
         main_camera (RmanSgCamera) - pointer to the main scene camera                            
         rman_root_sg_node (RixSGGroup) - the main root RixSceneGraph node
         render_default_light (bool) - whether to add a "headlight" light when there are no lights in the scene
@@ -115,16 +130,24 @@ class RmanScene(object):
         self.scene_any_lights = False
         self.is_xpu = False
 
-        self.rman_materials = dict()
-        self.rman_objects = dict()
+        self.rman_materials = RmanSgNodeDict()
+        self.rman_objects = RmanSgNodeDict()
         self.rman_translators = dict()
         self.rman_particles = dict()
         self.rman_cameras = dict()
         self.obj_hash = dict() 
         self.moving_objects = dict()
-        self.processed_obs = []
+        self.processed_obs = set()
+        self.rman_shared_geometry = dict()
 
         self.motion_steps = set()
+        self.rib_static_archive = None
+        self.rib_static_obs = set()
+        self.instanced_obs = set()
+        self.instance_records = dict()
+        self.material_users = dict()
+        self.object_materials = dict()
+        self.meta_families = None
         self.main_camera = None
         self.rman_root_sg_node = None
 
@@ -186,6 +209,13 @@ class RmanScene(object):
         self.moving_objects.clear()
         
         self.processed_obs.clear()
+        self.rman_shared_geometry.clear()
+        self.rib_static_obs.clear()
+        self.instanced_obs.clear()
+        self.instance_records.clear()
+        self.material_users.clear()
+        self.object_materials.clear()
+        self.meta_families = None
   
         self.render_default_light = False
         self.world_df_node = None
@@ -278,6 +308,92 @@ class RmanScene(object):
         self.export_data_blocks(objs)
         self.export_instances(obj_selected=objs)
 
+    def export_for_rib_static_archive(self, depsgraph, sg_scene):
+        '''Export only the static objects in the scene, to be written out as
+        a RIB archive that is shared by all of the frames in a RIB sequence.
+        '''
+        self.reset()
+        self.bl_scene = depsgraph.scene_eval
+        self.bl_local_view = False
+        self.bl_frame_current = self.bl_scene.frame_current
+        self.sg_scene = sg_scene
+        self.context = bpy.context
+        self.bl_view_layer = depsgraph.view_layer
+        self._find_renderman_layer()
+        self.depsgraph = depsgraph
+        self.rman_bake = False        
+        self.external_render = True
+        self.is_interactive = False
+        self.is_viewport_render = False
+        self.do_motion_blur = False
+
+        string_utils.set_var('scene', self.bl_scene.name.replace(' ', '_'))
+        string_utils.set_var('layer', self.bl_view_layer.name.replace(' ', '_'))
+
+        self.export_materials([m for m in self.depsgraph.ids if isinstance(m, bpy.types.Material)])
+        objs = [x for x in self.depsgraph.ids if isinstance(x, bpy.types.Object) and self._is_rib_static(x)]
+        self.export_data_blocks(objs)
+        static_obs = set([ob.original for ob in objs])
+
+        # only the objects themselves go into the archive. Any instances of them
+        # (ex: from particles or collections) are exported with the frame.
+        for ob_inst in self.depsgraph.object_instances:
+            if ob_inst.is_instance:
+                continue
+            if ob_inst.object.original in static_obs:
+                self._export_instance(ob_inst)
+
+        return len(static_obs)
+
+    def _is_rib_static(self, ob):
+        if not object_utils.is_static_geometry(ob):
+            return False
+        for mat in ob.data.materials:
+            if not mat:
+                continue
+            rman_sg_material = self.rman_materials.get(mat.original, None)
+            if rman_sg_material and (rman_sg_material.has_meshlight or rman_sg_material.is_frame_sensitive):
+                return False
+        return True
+
+    def export_rib_static_archive_ref(self, data_blocks):
+        '''Reference the static objects archive (rib_static_archive) from this scene,
+        instead of exporting the static objects again.
+
+        Arguments:
+            data_blocks (list) - the objects to be exported
+
+        Returns:
+            (list) - the objects that still need to be exported
+        '''
+        remaining = []
+        bounds = []
+        for ob in data_blocks:
+            if not self._is_rib_static(ob):
+                remaining.append(ob)
+                continue
+            self.rib_static_obs.add(ob.original)
+            mtx = np.array(ob.matrix_world)
+            corners = np.hstack((np.array(ob.bound_box), np.ones((8, 1))))
+            bounds.append((corners @ mtx.T)[:, :3])
+
+        if not self.rib_static_obs:
+            return remaining
+
+        bounds = np.vstack(bounds)
+        bmin = bounds.min(axis=0)
+        bmax = bounds.max(axis=0)
+        sg_node = self.sg_scene.CreateProcedural('rib_static_archive')
+        sg_node.Define("DelayedReadArchive", None)
+        primvar = sg_node.GetPrimVars()
+        primvar.SetString(self.rman.Tokens.Rix.k_filename, self.rib_static_archive)
+        primvar.SetFloatArray(self.rman.Tokens.Rix.k_bound, (bmin[0], bmax[0], bmin[1], bmax[1], bmin[2], bmax[2]), 6)
+        sg_node.SetPrimVars(primvar)
+        self.get_root_sg_node().AddChild(sg_node)
+        rfb_log().debug("Referencing %d static objects from: %s" % (len(self.rib_static_obs), self.rib_static_archive))
+
+        return remaining
+
     def export_for_swatch_render(self, depsgraph, sg_scene):
         self.sg_scene = sg_scene
         self.context = bpy.context #None
@@ -323,7 +439,10 @@ class RmanScene(object):
         
         rfb_log().debug("Calling export_data_blocks()")
         #self.export_data_blocks(bpy.data.objects)
-        self.export_data_blocks([x for x in self.depsgraph.ids if isinstance(x, bpy.types.Object)])
+        data_blocks = [x for x in self.depsgraph.ids if isinstance(x, bpy.types.Object)]
+        if self.rib_static_archive:
+            data_blocks = self.export_rib_static_archive_ref(data_blocks)
+        self.export_data_blocks(data_blocks)
 
         self.export_searchpaths() 
         self.export_global_options()     
@@ -586,18 +705,23 @@ class RmanScene(object):
             rfb_log().debug("   Exported %d/%d data blocks... (%s)" % (i, total, obj.name))
             self.rman_render.stats_mgr.set_export_stats("Exporting data blocks",i/total)
 
-    def export_data_block(self, db_ob):
-
-        # FIXME? 
-        # We currently export a unique geometry/mesh per Object
-        # This means we're not actually sharing datablocks per Object, even if they are shared
-        # in Blender. We do this for a couple of reasons:
+    def _get_shared_geometry_key(self, ob, rman_type):
+        # We normally export a unique geometry/mesh per Object, because:
         # 
         # 1. Each object can have different modifiers applied. This includes applying a subdiv and/or bevel modifiers.
         # 2. Each object may want a different number of deformation motion samples
         #
-        # This is incredibly wasteful when these don't apply. We could try and detect this case and
-        # create a shareable geometry.
+        # When these don't apply, objects that use the same datablock share one
+        # geometry prototype, and each object is just an instance group of it.
+        # We don't do this during IPR, since a shared prototype would need to be split
+        # as soon as one of its objects gets edited.
+        if self.is_interactive:
+            return None
+        if self.do_motion_blur and object_utils.is_transforming(ob):
+            return None
+        return object_utils.get_shared_geometry_key(ob, rman_type=rman_type)
+
+    def export_data_block(self, db_ob):
 
         obj = bpy.data.objects.get(db_ob.name, None)
         if not obj and self.is_swatch_render:
@@ -623,11 +747,22 @@ class RmanScene(object):
             if ob.original in self.rman_objects:
                 return
 
+            shared_key = self._get_shared_geometry_key(ob, rman_type)
+            if shared_key:
+                rman_sg_node = self.rman_shared_geometry.get(shared_key, None)
+                if rman_sg_node:
+                    rfb_log().debug("   Sharing geometry with %s (%s)" % (rman_sg_node.db_name, ob.name))
+                    self.rman_objects[ob.original] = rman_sg_node
+                    return rman_sg_node
+
             rman_sg_node = translator.export(ob, db_name)
             if not rman_sg_node:
                 return
             rman_sg_node.rman_type = rman_type
             self.rman_objects[ob.original] = rman_sg_node       
+            if shared_key:
+                rman_sg_node.is_shared_geometry = True
+                self.rman_shared_geometry[shared_key] = rman_sg_node
 
             if self.is_interactive and not ob.show_instancer_for_viewport:
                 rman_sg_node.sg_node.SetHidden(1)  
@@ -659,7 +794,7 @@ class RmanScene(object):
                     ob_psys[psys.settings.original] = rman_sg_particles
                     self.rman_particles[ob.original] = ob_psys 
                     self.rman_objects[psys.settings.original] = rman_sg_particles  
-                    self.processed_obs.append(psys.settings.original)
+                    self.processed_obs.add(psys.settings.original)
                     rman_sg_node.rman_sg_particle_group_node.sg_node.AddChild(rman_sg_particles.sg_node)
 
             elif rman_type == 'EMPTY' and (ob.hide_render or ob.hide_viewport):
@@ -690,7 +825,13 @@ class RmanScene(object):
                 if mb_deform_segs > 1:                       
                     subframes = scene_utils._get_subframes_(mb_deform_segs, self.bl_scene)
                     rman_sg_node.deform_motion_steps = subframes
-                    self.motion_steps.update(subframes)                         
+                    if rman_sg_node.is_deforming and rman_type in ['MESH', 'CURVE', 'POINTS'] and ob.renderman.deform_velocity_blur:
+                        # the deformation samples are derived from velocity when the 
+                        # object is translated, so we don't need to evaluate the scene 
+                        # at these subframes
+                        rman_sg_node.use_velocity_blur = True
+                    else:
+                        self.motion_steps.update(subframes)                         
 
             if rman_sg_node.is_transforming or rman_sg_node.is_deforming:
                 if mb_segs > 1 or mb_deform_segs > 1:
@@ -723,6 +864,14 @@ class RmanScene(object):
         num_lights = len(scene_utils.get_all_lights(self.bl_scene, include_light_filters=False))
         return num_lights > 0     
 
+    def get_meta_family_members(self, family):
+        # Return the (object, metaball) pairs that make up the metaball family
+        # named family. The family index is built once, with a single pass over
+        # bpy.data.objects, and reused for every family in the export.
+        if self.meta_families is None:
+            self.meta_families = object_utils.get_meta_families()
+        return self.meta_families.get(family, [])
+
     def _export_hidden_instance(self, ob, rman_sg_node):
         translator = self.rman_translators.get('EMPTY')
         translator.export_object_attributes(ob, rman_sg_node)  
@@ -769,6 +918,9 @@ class RmanScene(object):
 
         else:
             ob = ob_inst.object 
+            if ob.original in self.rib_static_obs:
+                # this object is in the static objects RIB archive
+                return
          
         if ob.type in ('ARMATURE', 'CAMERA'):
             return                         
@@ -799,6 +951,11 @@ class RmanScene(object):
                     return
         
             rman_sg_node = self.rman_objects.get(ob.original, None)           
+            if not rman_sg_node and ob.original in self.rib_static_obs:
+                # an instance of an object in the static objects RIB archive
+                # still needs the object to be exported in this frame
+                self.export_data_block(ob)
+                rman_sg_node = self.rman_objects.get(ob.original, None)
             if not rman_sg_node:
                 return
 
@@ -806,15 +963,23 @@ class RmanScene(object):
             if not translator:
                 return
 
+            if self.is_interactive:
+                self._index_instance(ob_inst, ob)
+
             if group_db_name in rman_sg_node.instances:
                 # we've already added this instance
                 return
             else:
 
-                if not ob.original in self.processed_obs:
+                # shared geometry only needs to be translated once,
+                # for the first object that uses it
+                processed_key = ob.original
+                if rman_sg_node.is_shared_geometry:
+                    processed_key = rman_sg_node
+                if not processed_key in self.processed_obs:
                     translator.update(ob, rman_sg_node)
                     translator.export_object_primvars(ob, rman_sg_node)
-                    self.processed_obs.append(ob.original)
+                    self.processed_obs.add(processed_key)
 
                 rman_sg_group = rman_group_translator.export(ob, group_db_name)
                 if ob.is_instancer and ob.instance_type != 'NONE':
@@ -885,9 +1050,9 @@ class RmanScene(object):
 
     def export_instances(self, obj_selected=None):
         total = len(self.depsgraph.object_instances)
-        obj_selected_names = []
+        obj_selected_names = set()
         if obj_selected:
-            obj_selected_names = [o.name for o in obj_selected]
+            obj_selected_names = set([o.name for o in obj_selected])
         for i, ob_inst in enumerate(self.depsgraph.object_instances):
             if obj_selected:
                 objFound = False
@@ -909,6 +1074,73 @@ class RmanScene(object):
             
             rfb_log().debug("   Exported %d/%d instances..." % (i, total))
 
+    def index_object_materials(self, ob):
+        # Record the materials used by ob's data, so we can find the users
+        # of a material without walking all of the instances
+        key = ob.original
+        for mat in self.object_materials.pop(key, set()):
+            users = self.material_users.get(mat, None)
+            if users is not None:
+                users.discard(key)
+        mats = set()
+        for mat in getattr(ob.data, 'materials', []):
+            if mat:
+                mats.add(mat.original)
+                self.material_users.setdefault(mat.original, set()).add(key)
+        self.object_materials[key] = mats
+
+    def unindex_object(self, key):
+        # Remove an object from the instance and material indices
+        for mat in self.object_materials.pop(key, set()):
+            users = self.material_users.get(mat, None)
+            if users is not None:
+                users.discard(key)
+                if not users:
+                    del self.material_users[mat]
+        self.instance_records.pop(key, None)
+        self.instanced_obs.discard(key)
+
+    def remap_object_index(self, old_key, new_key):
+        # After an undo, move the index entries of an object over to
+        # its new bpy.types.ID reference
+        mats = self.object_materials.pop(old_key, None)
+        if mats is not None:
+            self.object_materials[new_key] = mats
+            for mat in mats:
+                users = self.material_users.get(mat, None)
+                if users is not None and old_key in users:
+                    users.discard(old_key)
+                    users.add(new_key)
+        # the record still points at the old ID, so drop it. It will be recreated
+        # the next time the instance is exported
+        self.instance_records.pop(old_key, None)
+        if old_key in self.instanced_obs:
+            self.instanced_obs.discard(old_key)
+            self.instanced_obs.add(new_key)
+
+    def remap_material_index(self, old_key, new_key):
+        # After an undo, move the users of a material over to
+        # its new bpy.types.ID reference
+        users = self.material_users.pop(old_key, None)
+        if users is None:
+            return
+        self.material_users[new_key] = users
+        for ob_key in users:
+            mats = self.object_materials.get(ob_key, None)
+            if mats is not None and old_key in mats:
+                mats.discard(old_key)
+                mats.add(new_key)
+
+    def _index_instance(self, ob_inst, ob):
+        # Keep track of which objects are instanced by other objects, and a
+        # record of the instance for the ones that are not. See RmanSceneSync.reemit_instances
+        if ob_inst.is_instance:
+            self.instanced_obs.add(ob.original)
+        elif not isinstance(ob_inst, object_utils.ObjectInstanceRecord):
+            self.instance_records[ob.original] = object_utils.ObjectInstanceRecord(ob_inst)
+        if ob.original not in self.object_materials:
+            self.index_object_materials(ob)
+
     def attach_material(self, ob, rman_sg_node):
         mat = object_utils.get_active_material(ob)
         if mat:
@@ -940,13 +1172,98 @@ class RmanScene(object):
                     scenegraph_utils.set_material(group.sg_node, rman_sg_material.sg_node)
                     group.is_meshlight = rman_sg_material.has_meshlight 
 
-    def export_instances_motion(self, obj_selected=None):
-        origframe = self.bl_scene.frame_current
+    def _get_motion_sample_map(self, motion_steps):
+        # map each motion sample to its index in motion_steps
+        return {s: i for i, s in enumerate(motion_steps)}
 
-        mb_segs = self.bl_scene.renderman.motion_segments
-        origframe = self.bl_scene.frame_current      
+    def _add_to_moving_set(self, ob_inst, moving_groups, moving_dupli_obs):
+        # Called for each instance during the first motion sample. Record the instance
+        # if it will need transform samples for the rest of the motion samples.
+        psys = None
+        if ob_inst.is_instance:
+            ob = ob_inst.instance_object.original  
+            psys = ob_inst.particle_system
+        else:
+            ob = ob_inst.object
+
+        if ob.name_full not in self.moving_objects and not psys:
+            return
+
+        if ob.type not in ['MESH']:
+            return
 
+        rman_sg_node = self.rman_objects.get(ob.original, None)
+        if not rman_sg_node or not rman_sg_node.motion_steps:
+            return
+
+        if not rman_sg_node.is_transforming and not psys:
+            return
+
+        samples = self._get_motion_sample_map(rman_sg_node.motion_steps)
+        if ob_inst.is_instance:
+            # instances can only be reached through depsgraph.object_instances,
+            # so just remember which objects we need to look for
+            moving_dupli_obs[ob.original] = (rman_sg_node, samples)
+            return
+
+        group_db_name = object_utils.get_group_db_name(ob_inst)
+        rman_sg_group = rman_sg_node.instances.get(group_db_name, None)
+        if rman_sg_group:
+            moving_groups.append((ob.original, rman_sg_node, rman_sg_group, samples))
+
+    def _get_deforming_set(self):
+        # Get the objects and particle systems that need deformation samples.
+        deforming_obs = list()
+        for ob_original, rman_sg_node in self.rman_objects.items():
+            if not rman_sg_node.is_deforming or not rman_sg_node.deform_motion_steps:
+                continue
+            if rman_sg_node.use_velocity_blur:
+                continue
+            rman_type = rman_sg_node.rman_type
+            if rman_type not in ['MESH', 'FLUID', 'CURVE', 'POINTS']:
+                continue
+            translator = self.rman_translators.get(rman_type, None)
+            if translator:
+                samples = self._get_motion_sample_map(rman_sg_node.deform_motion_steps)
+                deforming_obs.append((ob_original, rman_sg_node, translator, samples))
+
+        moving_particles = dict()
+        for ob_original, ob_psys in self.rman_particles.items():
+            if ob_original not in self.rman_objects:
+                continue
+            psys_samples = dict()
+            for psys_settings, rman_sg_particles in ob_psys.items():
+                if rman_sg_particles.motion_steps:
+                    samples = self._get_motion_sample_map(rman_sg_particles.motion_steps)
+                    psys_samples[psys_settings] = (rman_sg_particles, samples)
+            if psys_samples:
+                moving_particles[ob_original] = psys_samples
+
+        return deforming_obs, moving_particles
+
+    def export_instances_motion(self, obj_selected=None):
+        origframe = self.bl_scene.frame_current
         motion_steps = sorted(list(self.motion_steps))
+        rman_group_translator = self.rman_translators['GROUP']
+        psys_translator = self.rman_translators['PARTICLES']
+
+        # The set of moving/deforming things is figured out once, during the first
+        # motion sample. The rest of the samples only visit what is in this set,
+        # rather than every instance and object in the scene.
+        #
+        # moving_groups - (ob.original, rman_sg_node, rman_sg_group, sample map) for
+        #                   regular objects that are transforming
+        # moving_dupli_obs - ob.original -> (rman_sg_node, sample map), for objects
+        #                   with instances that move, ex: particle instances
+        # deforming_obs - (ob.original, rman_sg_node, translator, sample map)
+        # moving_particles - ob.original -> psys.settings.original -> (rman_sg_particles, sample map)
+        moving_groups = list()
+        moving_dupli_obs = dict()
+        deforming_obs = list()
+        moving_particles = dict()
+        cam_samples = dict()
+        if self.main_camera.is_transforming:
+            cam_samples = self._get_motion_sample_map(self.main_camera.motion_steps)
 
         first_sample = False
         delta = -motion_steps[0]
@@ -959,107 +1276,91 @@ class RmanScene(object):
 
             self.depsgraph.update()
             time_samp = seg + delta # get the normlized version of the segment
-            total = len(self.depsgraph.object_instances)
-            objFound = False
-            
-            # update camera
-            if not first_sample and self.main_camera.is_transforming and seg in self.main_camera.motion_steps:
-                cam_translator =  self.rman_translators['CAMERA']
-                idx = 0
-                for i, s in enumerate(self.main_camera.motion_steps):
-                    if s == seg:
-                        idx = i
-                        break
-                cam_translator.update_transform(self.depsgraph.scene_eval.camera, self.main_camera, idx, time_samp)
-
-            for i, ob_inst in enumerate(self.depsgraph.object_instances):  
-                if obj_selected:
-                    if objFound:
-                        break
-
-                    if ob_inst.is_instance:
-                        if ob_inst.instance_object.name == obj_selected:
-                            objFound = True
-                    elif ob_inst.object.name == obj_selected.name:
-                            objFound = True
-
-                    if not objFound:
-                        continue       
-
-                if not ob_inst.show_self:
-                    continue                    
-
-                if first_sample:
-                    # for the first motion sample use _export_instance()
+
+            if first_sample:
+                # for the first motion sample use _export_instance()
+                total = len(self.depsgraph.object_instances)
+                objFound = False
+                for i, ob_inst in enumerate(self.depsgraph.object_instances):  
+                    if obj_selected:
+                        if objFound:
+                            break
+
+                        if ob_inst.is_instance:
+                            if ob_inst.instance_object.name == obj_selected:
+                                objFound = True
+                        elif ob_inst.object.name == obj_selected.name:
+                                objFound = True
+
+                        if not objFound:
+                            continue       
+
+                    if not ob_inst.show_self:
+                        continue                    
+
                     self._export_instance(ob_inst, seg=time_samp)  
+                    self._add_to_moving_set(ob_inst, moving_groups, moving_dupli_obs)
                     self.rman_render.stats_mgr.set_export_stats("Exporting instances (%f)" % seg, i/total)
-                    continue  
 
-                rman_group_translator = self.rman_translators['GROUP']
-                psys = None
-                if ob_inst.is_instance:
-                    ob = ob_inst.instance_object.original  
-                    psys = ob_inst.particle_system
-                else:
-                    ob = ob_inst.object
+                deforming_obs, moving_particles = self._get_deforming_set()
+                rfb_log().debug("   Motion blur: %d moving objects, %d objects with moving instances, %d deforming objects" % 
+                                (len(moving_groups), len(moving_dupli_obs), len(deforming_obs)))
 
-                if ob.name_full not in self.moving_objects and not psys:
-                    continue
-
-                if ob.type not in ['MESH']:
-                    continue                
+            else:
+                self.rman_render.stats_mgr.set_export_stats("Exporting motion samples (%f)" % seg, samp/len(motion_steps))
 
-                group_db_name = object_utils.get_group_db_name(ob_inst)          
+                # update camera
+                idx = cam_samples.get(seg, None)
+                if idx is not None:
+                    cam_translator =  self.rman_translators['CAMERA']
+                    cam_translator.update_transform(self.depsgraph.scene_eval.camera, self.main_camera, idx, time_samp)
 
-                rman_sg_node = self.rman_objects.get(ob.original, None)
-                if not rman_sg_node:
-                    continue
-                
-                if not seg in rman_sg_node.motion_steps:
-                    continue
+                for ob_original, rman_sg_node, rman_sg_group, samples in moving_groups:
+                    idx = samples.get(seg, None)
+                    if idx is None:
+                        continue
+                    ob = ob_original.evaluated_get(self.depsgraph)
+                    rman_group_translator.update_transform_num_samples(rman_sg_group, rman_sg_node.motion_steps ) # should have been set in _export_instances()                       
+                    rman_group_translator.update_transform_sample( ob, rman_sg_group, idx, time_samp)
 
-                idx = 0
-                for i, s in enumerate(rman_sg_node.motion_steps):
-                    if s == seg:
-                        idx = i
-                        break                
+                if moving_dupli_obs:
+                    for ob_inst in self.depsgraph.object_instances:
+                        if not ob_inst.is_instance or not ob_inst.show_self:
+                            continue
+                        ob = ob_inst.instance_object.original  
+                        rman_sg_node, samples = moving_dupli_obs.get(ob, (None, None))
+                        if not rman_sg_node:
+                            continue
+                        psys = ob_inst.particle_system
+                        if not psys and (ob.name_full not in self.moving_objects or not rman_sg_node.is_transforming):
+                            continue
+                        idx = samples.get(seg, None)
+                        if idx is None:
+                            continue
 
-                if rman_sg_node.is_transforming or psys:
-                    rman_sg_group = rman_sg_node.instances.get(group_db_name, None)
-                    if rman_sg_group:
-                        rman_group_translator.update_transform_num_samples(rman_sg_group, rman_sg_node.motion_steps ) # should have been set in _export_instances()                       
-                        rman_group_translator.update_transform_sample( ob_inst, rman_sg_group, idx, time_samp)
+                        group_db_name = object_utils.get_group_db_name(ob_inst)          
+                        rman_sg_group = rman_sg_node.instances.get(group_db_name, None)
+                        if rman_sg_group:
+                            rman_group_translator.update_transform_num_samples(rman_sg_group, rman_sg_node.motion_steps ) # should have been set in _export_instances()                       
+                            rman_group_translator.update_transform_sample( ob_inst, rman_sg_group, idx, time_samp)
 
-                self.rman_render.stats_mgr.set_export_stats("Exporting instances (%f)" % seg, i/total)
+            for ob_original, psys_samples in moving_particles.items():
+                ob = ob_original.evaluated_get(self.depsgraph)
+                for psys in ob.particle_systems:
+                    rman_sg_particles, samples = psys_samples.get(psys.settings.original, (None, None))
+                    if not rman_sg_particles:
+                        continue
+                    idx = samples.get(seg, None)
+                    if idx is None:
+                        continue
+                    psys_translator.export_deform_sample(rman_sg_particles, ob, psys, idx)                                    
 
-            for ob_original,rman_sg_node in self.rman_objects.items():
+            for ob_original, rman_sg_node, translator, samples in deforming_obs:
+                idx = samples.get(seg, None)
+                if idx is None:
+                    continue
                 ob = ob_original.evaluated_get(self.depsgraph)
-                psys_translator = self.rman_translators['PARTICLES']
-                particle_systems = getattr(ob, 'particle_systems', list())
-                for psys in particle_systems:
-                    ob_psys = self.rman_particles.get(ob.original, dict())
-                    rman_sg_particles = ob_psys.get(psys.settings.original, None)
-                    if rman_sg_particles:
-                        if not seg in rman_sg_particles.motion_steps:
-                            continue
-                        idx = 0
-                        for i, s in enumerate(rman_sg_node.motion_steps):
-                            if s == seg:
-                                idx = i
-                                break                           
-                        psys_translator.export_deform_sample(rman_sg_particles, ob, psys, idx)                                    
-
-                if rman_sg_node.is_deforming and seg in rman_sg_node.deform_motion_steps:
-                    rman_type = rman_sg_node.rman_type
-                    if rman_type in ['MESH', 'FLUID']:
-                        translator = self.rman_translators.get(rman_type, None)
-                        if translator:
-                            idx = 0
-                            for i, s in enumerate(rman_sg_node.deform_motion_steps):
-                                if s == seg:
-                                    idx = i
-                                    break                            
-                            translator.export_deform_sample(rman_sg_node, ob, idx)                     
+                translator.export_deform_sample(rman_sg_node, ob, idx)                     
 
         self.rman_render.bl_engine.frame_set(origframe, subframe=0)  
 
@@ -1318,7 +1619,7 @@ class RmanScene(object):
                 self.rman_cameras[main_cam.original] = self.main_camera
                 self.rman_objects[main_cam.original] = self.main_camera
       
-                self.processed_obs.append(main_cam.original)
+                self.processed_obs.add(main_cam.original)
         else:
             if self.is_interactive:
                 main_cam = self.context.space_data.camera
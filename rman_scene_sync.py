@@ -8,8 +8,108 @@ from .rfb_utils import shadergraph_utils
 from .rfb_logger import rfb_log
 from .rman_sg_nodes.rman_sg_lightfilter import RmanSgLightFilter
 
+from .rfb_utils.prefs_utils import get_pref
 from . import rman_constants
 import bpy
+import time
+
+class RmanPendingUpdate(object):
+    '''
+    A stand-in for bpy.types.DepsgraphUpdate, that can outlive the depsgraph update
+    callback. Updates for the same datablock are merged into one RmanPendingUpdate,
+    by or'ing their flags. The datablock itself is re-evaluated when the update is
+    committed, so the latest value always wins.
+
+    Attributes:
+        original (bpy.types.ID) - the original datablock that was updated
+        id (bpy.types.ID) - the evaluated datablock, see evaluated()
+        is_updated_transform (bool) - the object transform was updated
+        is_updated_geometry (bool) - the object geometry was updated
+        is_updated_shading (bool) - the object shading was updated
+    '''
+
+    def __init__(self, update):
+        self.original = update.id.original
+        self.id = update.id
+        self.is_updated_transform = update.is_updated_transform
+        self.is_updated_geometry = update.is_updated_geometry
+        self.is_updated_shading = update.is_updated_shading
+
+    def merge(self, update):
+        self.is_updated_transform |= update.is_updated_transform
+        self.is_updated_geometry |= update.is_updated_geometry
+        self.is_updated_shading |= update.is_updated_shading
+
+    def evaluated(self, depsgraph):
+        '''Point id to the evaluated datablock in depsgraph.
+
+        Returns:
+            (bool) - False if the datablock no longer exists
+        '''
+        try:
+            self.id = self.original.evaluated_get(depsgraph)
+        except ReferenceError:
+            return False
+        except RuntimeError:
+            # not part of the depsgraph
+            self.id = self.original
+        return True
+
+class RmanDirtySets(object):
+    '''
+    The datablocks found dirty in one call to RmanSceneSync.update_scene, sorted by
+    the kind of work they need. Each dictionary is keyed by the original datablock,
+    so a datablock is only processed once per set, however many updates it got.
+
+    Object entries are (update, rman_type, rman_sg_node, is_hidden) tuples.
+
+    Attributes:
+        scene (bool) - the scene was updated
+        world (bool) - the world was updated
+        materials (dict) - material updates
+        node_groups (set) - our fake node groups that were updated
+        particle_settings (set) - particle settings that were updated
+        new_lightfilters (set) - light filters that were added
+        visibility (dict) - objects to check the visibility of
+        lights (dict) - lights and light filters that were transformed or updated
+        transforms (dict) - objects that were transformed
+        geometry (dict) - objects whose geometry was updated
+        collections (dict) - collections that were updated
+        instancers (dict) - geometry node trees, and empty instancers that were added
+        cameras (dict) - camera datablocks, and camera objects that were transformed or updated
+        retry_add (bool) - an object was added that can't be translated yet
+    '''
+
+    def __init__(self):
+        self.scene = False
+        self.world = False
+        self.materials = dict()
+        self.node_groups = set()
+        self.particle_settings = set()
+        self.new_lightfilters = set()
+        self.visibility = dict()
+        self.lights = dict()
+        self.transforms = dict()
+        self.geometry = dict()
+        self.collections = dict()
+        self.instancers = dict()
+        self.cameras = dict()
+        self.retry_add = False
+
+    def discard(self, ob_key):
+        '''Remove an object from the transform and geometry sets
+        '''
+        self.lights.pop(ob_key, None)
+        self.transforms.pop(ob_key, None)
+        self.geometry.pop(ob_key, None)
+        self.cameras.pop(ob_key, None)
+
+    def __str__(self):
+        return ('scene=%d world=%d materials=%d visibility=%d lights=%d transforms=%d '
+                'geometry=%d collections=%d instancers=%d cameras=%d' %
+                (self.scene, self.world, len(self.materials), len(self.visibility), len(self.lights),
+                len(self.transforms), len(self.geometry), len(self.collections),
+                len(self.instancers), len(self.cameras)))
 
 class RmanSceneSync(object):
     '''
@@ -37,6 +137,11 @@ class RmanSceneSync(object):
         self.do_delete = False # whether or not we need to do an object deletion
         self.do_add = False # whether or not we need to add an object
         self.num_instances_changed = False # if the number of instances has changed since the last update
+        self.updated_instancers = set() # collections and objects whose instances were already updated
+
+        self.pending_updates = dict() # original datablock -> RmanPendingUpdate, waiting to be committed
+        self.num_merged_updates = 0 # number of updates merged into pending_updates since the last commit
+        self.last_commit_time = 0.0 # time.time() of the last commit
 
     @property
     def sg_scene(self):
@@ -136,33 +241,73 @@ class RmanSceneSync(object):
                     if translator and rman_sg_node.is_frame_sensitive:
                         translator.update(o, rman_sg_node)                   
 
+    def _get_indexed_instances(self, obs):
+        # Split obs into the objects whose instances we can get from the instance
+        # index, and the ones we need to walk depsgraph.object_instances for. 
+        # Objects that are instanced by other objects always need the walk, as do all objects
+        # when the number of instances has changed (there may be new instances)
+        records = dict()
+        walk_obs = set()
+        for ob_key in obs:
+            record = self.rman_scene.instance_records.get(ob_key, None)
+            if self.num_instances_changed or record is None or ob_key in self.rman_scene.instanced_obs:
+                walk_obs.add(ob_key)
+                continue
+            try:
+                record = record.evaluated(self.rman_scene.depsgraph)
+            except ReferenceError:
+                self.rman_scene.instance_records.pop(ob_key, None)
+                walk_obs.add(ob_key)
+                continue
+            ob = record.object
+            if ob.is_instancer or len(getattr(ob, 'particle_systems', list())) > 0:
+                # show_self and show_particles depend on the instancing and particle 
+                # settings, which may have changed since the record was made
+                walk_obs.add(ob_key)
+            else:
+                records[ob_key] = record
+        return records, walk_obs
+
     def _mesh_light_update(self, mat):
+        def reexport_instance(ob, ob_inst, group_db_name):
+            if not hasattr(ob.data, 'materials'):
+                return
+            if ob.type in ('ARMATURE', 'CURVE', 'CAMERA'):
+                return
+            rman_sg_node = self.rman_scene.rman_objects.get(ob.original, None)
+            if rman_sg_node:
+                rman_sg_group = rman_sg_node.instances.get(group_db_name, None)
+                if rman_sg_group:
+                    rman_sg_node.instances.pop(group_db_name)
+                    self.rman_scene.sg_scene.DeleteDagNode(rman_sg_group.sg_node)                              
+                    self.rman_scene._export_instance(ob_inst)
+
+        users = self.rman_scene.material_users.get(mat.original, None)
+        if users is None:
+            # the material isn't in our index (ex: it was re-allocated by an undo),
+            # so look for it by name on all of the instances
+            records = dict()
+            walk_obs = None
+        else:
+            records, walk_obs = self._get_indexed_instances(users)
         with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):
+            for ob_key, record in records.items():
+                reexport_instance(record.object, record, object_utils.get_group_db_name(record))
+
+            if walk_obs is not None and not walk_obs:
+                return
             for ob_inst in self.rman_scene.depsgraph.object_instances:
-                psys = None
                 if ob_inst.is_instance:
                     ob = ob_inst.instance_object
-                    group_db_name =  object_utils.get_group_db_name(ob_inst)
                 else:
                     ob = ob_inst.object
-                    group_db_name =  object_utils.get_group_db_name(ob_inst)
-                if not hasattr(ob.data, 'materials'):
-                    continue   
-                if ob.type in ('ARMATURE', 'CURVE', 'CAMERA'):
-                    continue                         
-                rman_sg_node = self.rman_scene.rman_objects.get(ob.original, None)
-                if rman_sg_node:
-                    found = False
-                    for name, material in ob.data.materials.items():
-                        if name == mat.name:
-                            found = True
-
-                    if found:
-                        rman_sg_group = rman_sg_node.instances.get(group_db_name, None)
-                        if rman_sg_group:
-                            rman_sg_node.instances.pop(group_db_name)
-                            self.rman_scene.sg_scene.DeleteDagNode(rman_sg_group.sg_node)                              
-                            self.rman_scene._export_instance(ob_inst)                 
+                if walk_obs is None:
+                    materials = getattr(ob.data, 'materials', None)
+                    if materials is None or mat.name not in materials.keys():
+                        continue
+                elif ob.original not in walk_obs:
+                    continue
+                reexport_instance(ob, ob_inst, object_utils.get_group_db_name(ob_inst))
 
     def _material_updated(self, obj):
         mat = obj.id
@@ -185,7 +330,7 @@ class RmanSceneSync(object):
                 translator.update(mat, rman_sg_material)   
 
         # update db_name
-        rman_sg_material.db_name = db_name
+        self.rman_scene.rman_materials.update_db_name(mat.original, db_name)
 
     def _light_filter_transform_updated(self, obj):
         ob = obj.id
@@ -255,6 +400,7 @@ class RmanSceneSync(object):
                 translator.export_object_primvars(ob, rman_sg_node)
                 # material slots could have changed, so we need to double
                 # check that too
+                self.rman_scene.index_object_materials(ob)
                 for k,v in rman_sg_node.instances.items():
                     self.rman_scene.attach_material(ob, v)
 
@@ -457,17 +603,8 @@ class RmanSceneSync(object):
             # Re-emit instances for all objects in self.update_instances
             rfb_log().debug("Re-emit instances")
             rman_group_translator = self.rman_scene.rman_translators['GROUP']
-            for ob_inst in self.rman_scene.depsgraph.object_instances: 
-                parent = None
-                if ob_inst.is_instance:
-                    ob = ob_inst.instance_object
-                    parent = ob_inst.parent
-                else:
-                    ob = ob_inst.object
-
-                if ob.original not in self.update_instances:
-                    continue
 
+            def reemit_instance(ob, ob_inst, parent):
                 rman_type = object_utils._detect_primitive_(ob)
                 rman_sg_node = self.rman_scene.rman_objects.get(ob.original, None)
                 if rman_sg_node:
@@ -484,10 +621,31 @@ class RmanSceneSync(object):
                             self.rman_scene.attach_particle_material(rman_sg_group.bl_psys_settings, parent, ob, rman_sg_group)
                         else:
                             self.rman_scene.attach_material(ob, rman_sg_group)
-                        continue                    
+                        return                    
                 
                 self.rman_scene._export_instance(ob_inst)            
 
+            # objects that are only instanced by themselves don't need the
+            # full instance walk
+            records, walk_obs = self._get_indexed_instances(self.update_instances)
+            for ob_key, record in records.items():
+                reemit_instance(record.object, record, None)
+
+            if not walk_obs:
+                return
+            for ob_inst in self.rman_scene.depsgraph.object_instances: 
+                parent = None
+                if ob_inst.is_instance:
+                    ob = ob_inst.instance_object
+                    parent = ob_inst.parent
+                else:
+                    ob = ob_inst.object
+
+                if ob.original not in walk_obs:
+                    continue
+
+                reemit_instance(ob, ob_inst, parent)
+
     def clear_instances(self, ob, rman_sg_node=None):
         rfb_log().debug("Deleting instances")
         with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):
@@ -503,15 +661,12 @@ class RmanSceneSync(object):
 
     def update_materials_dict(self, mat):    
         # See comment below in update_objects_dict 
-        rman_sg_material = None
-        for id, rman_sg_node in self.rman_scene.rman_materials.items():
-            if rman_sg_node:
-                db_name = object_utils.get_db_name(mat)
-                if rman_sg_node.db_name == db_name:
-                    self.rman_scene.rman_materials[mat.original] = rman_sg_node
-                    del self.rman_scene.rman_materials[id]
-                    rman_sg_material = rman_sg_node 
-                    break
+        db_name = object_utils.get_db_name(mat)
+        id, rman_sg_material = self.rman_scene.rman_materials.find_by_db_name(db_name)
+        if rman_sg_material:
+            del self.rman_scene.rman_materials[id]
+            self.rman_scene.rman_materials[mat.original] = rman_sg_material
+            self.rman_scene.remap_material_index(id, mat.original)
         
         return rman_sg_material
 
@@ -521,18 +676,15 @@ class RmanSceneSync(object):
         # references to be invalidated (see: https://docs.blender.org/api/current/info_gotcha.html)
         # We don't want to accidentally mistake this for a new object, so we need to update
         # our objects dictionary with the new bpy.types.ID reference
-        rman_sg_node = None
-        for id, rsn in self.rman_scene.rman_objects.items():
-            if rsn:
-                db_name = object_utils.get_db_name(ob, rman_type=rman_type)
-                if rsn.db_name == db_name:
-                    self.rman_scene.rman_objects[ob.original] = rsn
-                    del self.rman_scene.rman_objects[id]
-                    if id in self.rman_scene.rman_cameras:
-                        self.rman_scene.rman_cameras[ob.original] = rsn
-                        del self.rman_scene.rman_cameras[id]
-                    rman_sg_node = rsn
-                    break
+        db_name = object_utils.get_db_name(ob, rman_type=rman_type)
+        id, rman_sg_node = self.rman_scene.rman_objects.find_by_db_name(db_name)
+        if rman_sg_node:
+            del self.rman_scene.rman_objects[id]
+            self.rman_scene.rman_objects[ob.original] = rman_sg_node
+            self.rman_scene.remap_object_index(id, ob.original)
+            if id in self.rman_scene.rman_cameras:
+                self.rman_scene.rman_cameras[ob.original] = rman_sg_node
+                del self.rman_scene.rman_cameras[id]
         return rman_sg_node
 
     def update_collection(self, coll):
@@ -541,6 +693,9 @@ class RmanSceneSync(object):
         # the collection could have been updated with new objects
         # FIXME: like grease pencil above we seem to crash when removing and adding instances 
         # of curves, we need to figure out what's going on
+        if coll.original in self.updated_instancers:
+            return
+        self.updated_instancers.add(coll.original)
         for o in coll.all_objects:
             if o.type in ('ARMATURE', 'CURVE', 'CAMERA'):
                 continue
@@ -579,6 +734,10 @@ class RmanSceneSync(object):
                         self.update_collection(instance_coll)                
 
 
+        if obj.original in self.updated_instancers:
+            return
+        self.updated_instancers.add(obj.original)
+
         if rman_constants.BLENDER_VERSION_MAJOR >= 2 and rman_constants.BLENDER_VERSION_MINOR >= 92:
             if isinstance(obj, bpy.types.GeometryNodeTree):
                 rfb_log().debug("Geometry Node Tree updated: %s" % obj.name)
@@ -601,69 +760,73 @@ class RmanSceneSync(object):
                     translator.update(portal, rman_sg_node)
 
 
-    def update_scene(self, context, depsgraph):
-        ## FIXME: this function is waaayyy too big and is doing too much stuff
-
-        self.new_objects.clear() 
-        self.new_cameras.clear()
-        self.update_instances.clear()
-        self.update_particles.clear()
-
-        self.do_delete = False # whether or not we need to do an object deletion
-        self.do_add = False # whether or not we need to add an object
-        self.num_instances_changed = False # if the number of instances has changed since the last update
-                
-        self.rman_scene.depsgraph = depsgraph
-        self.rman_scene.bl_scene = depsgraph.scene
-        self.rman_scene.context = context           
-
-        particle_settings_node = None   
-        prev_num_instances = self.rman_scene.num_object_instances # the number of instances previously
-        
-        # Check the number of instances. If we differ, an object may have been
-        # added or deleted
-        if self.rman_scene.num_object_instances != len(depsgraph.object_instances):
-            self.num_instances_changed = True
-            if self.rman_scene.num_object_instances > len(depsgraph.object_instances):
-                self.do_delete = True
+    def queue_updates(self, depsgraph):
+        '''Add the updates of depsgraph to pending_updates, merging them
+        with any pending update for the same datablock.
+        '''
+        for update in depsgraph.updates:
+            key = update.id.original
+            pending = self.pending_updates.get(key, None)
+            if pending:
+                pending.merge(update)
+                self.num_merged_updates += 1
             else:
-                self.do_add = True
-            self.rman_scene.num_object_instances = len(depsgraph.object_instances)
-
-        rfb_log().debug("------Start update scene--------")
-        for obj in reversed(depsgraph.updates):
+                self.pending_updates[key] = RmanPendingUpdate(update)
+
+    def has_pending_updates(self):
+        return len(self.pending_updates) > 0
+
+    def commit_updates(self, context, depsgraph, force=False):
+        '''Commit the pending updates to the scene graph, if at least
+        rman_ipr_update_interval seconds have passed since the last commit.
+
+        Returns:
+            (bool) - True if the updates were committed, or there was nothing to commit
+        '''
+        if not self.pending_updates:
+            return True
+        interval = get_pref('rman_ipr_update_interval', default=0.05)
+        if not force and (time.time() - self.last_commit_time) < interval:
+            return False
+
+        updates = []
+        for pending in self.pending_updates.values():
+            if pending.evaluated(depsgraph):
+                updates.append(pending)
+        num_merged = self.num_merged_updates
+        self.pending_updates.clear()
+        self.num_merged_updates = 0
+
+        rfb_log().debug("Committing %d updates (%d merged)" % (len(updates), num_merged))
+        self.update_scene(context, depsgraph, updates=updates)
+        self.last_commit_time = time.time()
+        return True
+
+    def _classify_updates(self, updates):
+        '''Sort the depsgraph updates into dirty sets. No translation work is
+        done here, apart from re-binding nodes to their datablocks after an undo.
+
+        Returns:
+            (RmanDirtySets) - the dirty sets
+        '''
+        dirty = RmanDirtySets()
+
+        for obj in reversed(updates):
             ob = obj.id
 
             if isinstance(obj.id, bpy.types.Scene):
-                self._scene_updated()
+                dirty.scene = True
 
             elif isinstance(obj.id, bpy.types.World):
-                with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene): 
-                    self.rman_scene.export_integrator()
-                    self.rman_scene.export_samplefilters()
-                    self.rman_scene.export_displayfilters()
-                    self.rman_scene.export_viewport_stats()
+                dirty.world = True
 
             elif isinstance(obj.id, bpy.types.Camera):
                 rfb_log().debug("Camera updated: %s" % obj.id.name)
-                if self.rman_scene.is_viewport_render:
-                    if self.rman_scene.bl_scene.camera.data != obj.id:
-                        continue
-                    rman_sg_camera = self.rman_scene.main_camera
-                    translator = self.rman_scene.rman_translators['CAMERA']
-                    with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):
-                        translator.update_viewport_cam(self.rman_scene.bl_scene.camera, rman_sg_camera, force_update=True)       
-                else:
-                    translator = self.rman_scene.rman_translators['CAMERA']                 
-                    with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):
-                        for ob, rman_sg_camera in self.rman_scene.rman_cameras.items():     
-                            if ob.original.name != obj.id.name:
-                                continue
-                            translator._update_render_cam(ob.original, rman_sg_camera)
+                dirty.cameras[obj.id.original] = (obj, None, None, False)
 
             elif isinstance(obj.id, bpy.types.Material):
                 rfb_log().debug("Material updated: %s" % obj.id.name)
-                self._material_updated(obj)    
+                dirty.materials[obj.id.original] = obj
 
             elif isinstance(obj.id, bpy.types.Mesh):
                 rfb_log().debug("Mesh updated: %s" % obj.id.name)
@@ -695,25 +858,19 @@ class RmanSceneSync(object):
                 rfb_log().debug("ParticleSettings updated: %s" % obj.id.name)
                 # Save this particle settings node, so we can check for it later 
                 # when we process object changes
-                particle_settings_node = obj.id.original
+                dirty.particle_settings.add(obj.id.original)
 
             elif isinstance(obj.id, bpy.types.ShaderNodeTree):
                 if obj.id.name in bpy.data.node_groups:
                     # this is probably one of our fake node groups with ramps
-                    # update all of the users of this node tree
                     rfb_log().debug("ShaderNodeTree updated: %s" % obj.id.name)
-                    users = context.blend_data.user_map(subset={obj.id.original})
-                    for o in users[obj.id.original]:
-                        if hasattr(o, 'rman_nodetree'):
-                            o.rman_nodetree.update_tag()
-                        elif hasattr(o, 'node_tree'):
-                            o.node_tree.update_tag()                
+                    dirty.node_groups.add(obj.id.original)
                                             
             elif isinstance(obj.id, bpy.types.Object):
-                particle_systems = getattr(obj.id, 'particle_systems', list())
-                has_particle_systems = len(particle_systems) > 0
-
                 rman_type = object_utils._detect_primitive_(ob)
+                if rman_type == 'META':
+                    # the object could have been renamed into a different family
+                    self.rman_scene.meta_families = None
                 # grab the object from bpy.data, because the depsgraph doesn't seem
                 # to get the updated viewport hidden value                
                 ob_data = bpy.data.objects.get(ob.name, ob)
@@ -732,138 +889,275 @@ class RmanSceneSync(object):
                 if self.do_add and not rman_sg_node:
                     rman_type = object_utils._detect_primitive_(ob_data)
 
-                    if ob_data.hide_get():
+                    if is_hidden:
                         # don't add if this hidden in the viewport
                         continue                    
                     if ob.type == 'CAMERA': 
                         self.new_cameras.add(obj.id.original)
+                    elif rman_type == 'EMPTY' and ob.is_instancer:
+                        dirty.instancers[obj.id.original] = ob
                     else:
-                        if rman_type == 'EMPTY' and ob.is_instancer:
-                            self.update_empty(ob)
+                        if rman_type == 'LIGHT':
+                            # double check if this light is an rman light
+                            # for now, we don't support adding Blender lights in IPR
+                            #
+                            # we can also get to this point when adding new rman lights because
+                            # blender will tell us a new light has been added before we've had to chance
+                            # to modify its properties to be an rman light, so we don't want to
+                            # add this light just yet.
+                            if not shadergraph_utils.is_rman_light(ob):
+                                dirty.retry_add = True
+                                continue
+                        elif rman_type == 'EMPTY':
+                            # same issue can also happen with empty
+                            # we have not been able to tag our types before Blender
+                            # tells us an empty has been added
+                            dirty.retry_add = True
+                            continue
+                        rfb_log().debug("New object added: %s" % obj.id.name)                           
+                        self.update_instances.add(obj.id.original)
+                        if rman_type == 'LIGHTFILTER':
+                            # Add Light filters before anything else, so that lights
+                            # can reference them ASAP.
+                            dirty.new_lightfilters.add(obj.id.original)
                         else:
-                            if rman_type == 'LIGHT':
-                                # double check if this light is an rman light
-                                # for now, we don't support adding Blender lights in IPR
-                                #
-                                # we can also get to this point when adding new rman lights because
-                                # blender will tell us a new light has been added before we've had to chance
-                                # to modify its properties to be an rman light, so we don't want to
-                                # add this light just yet.
-                                if not shadergraph_utils.is_rman_light(ob):
-                                    self.rman_scene.num_object_instances = prev_num_instances
-                                    rfb_log().debug("------End update scene----------")
-                                    return
-                            elif rman_type == 'EMPTY':
-                                # same issue can also happen with empty
-                                # we have not been able to tag our types before Blender
-                                # tells us an empty has been added
-                                self.rman_scene.num_object_instances = prev_num_instances
-                                rfb_log().debug("------End update scene----------")
-                                return
-                            rfb_log().debug("New object added: %s" % obj.id.name)                           
                             self.new_objects.add(obj.id.original)
-                            self.update_instances.add(obj.id.original)
-                            if rman_type == 'LIGHTFILTER':
-                                # Add Light filters immediately, so that lights
-                                # can reference them ASAP.
-                                self.add_objects()
-                                self.new_objects.remove(obj.id.original)   
-                                self.num_instances_changed = False
                     continue      
 
-                if rman_sg_node and rman_sg_node.sg_node:
-                    # update db_name
-                    db_name = object_utils.get_db_name(ob, rman_type=rman_type)
-                    rman_sg_node.db_name = db_name
-                    if self.update_object_visibility(rman_sg_node, ob):
-                        continue
+                if not rman_sg_node or not rman_sg_node.sg_node:
+                    continue
+
+                entry = (obj, rman_type, rman_sg_node, is_hidden)
+                dirty.visibility[obj.id.original] = entry
+                if not (obj.is_updated_transform or obj.is_updated_geometry):
+                    continue
+                if ob.type == 'CAMERA':
+                    dirty.cameras[obj.id.original] = entry
+                elif rman_type in ['LIGHT', 'LIGHTFILTER']:
+                    dirty.lights[obj.id.original] = entry
                 else:
-                    continue        
-
-                if obj.is_updated_transform:
-                    rfb_log().debug("Transform updated: %s" % obj.id.name)                  
-                    if ob.type in ['CAMERA']:
-                        # we deal with main camera transforms in view_draw
-                        rman_sg_camera = self.rman_scene.rman_cameras[ob.original]
-                        if rman_sg_camera == self.rman_scene.main_camera:
-                            continue
-                        translator = self.rman_scene.rman_translators['CAMERA']
-                        with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):
-                            translator._update_render_cam_transform(ob, rman_sg_camera)                        
-                        continue
-                    
-                    if rman_type == 'LIGHTFILTER':
-                        self._light_filter_transform_updated(obj)
-                    elif rman_type == 'GPENCIL':
-                        # FIXME: we shouldn't handle this specifically, but we seem to be
-                        # hitting a prman crash when removing and adding instances of
-                        # grease pencil curves
-                        self._gpencil_transform_updated(obj)
-                    elif rman_type == 'EMPTY':
-                        self.update_empty(ob, rman_sg_node)
-                    elif self.num_instances_changed:
-                        rman_sg_node = self.rman_scene.rman_objects.get(obj.id.original, None)
-                        for instance_obj in rman_sg_node.objects_instanced:
-                            self.clear_instances(instance_obj)
-                            self.update_instances.add(instance_obj)
-                        rman_sg_node.objects_instanced.clear()                            
-                    else:
-                        # This is a simple transform. We don't clear the instances.
+                    if obj.is_updated_transform:
+                        dirty.transforms[obj.id.original] = entry
+                    if obj.is_updated_geometry and not is_hidden:
+                        dirty.geometry[obj.id.original] = entry
 
-                        # We always have to update particle systems when the object has transformed
-                        # A transform changed can also be triggered when a particle system is removed.        
-                        self.update_particles.add(obj.id)                        
-                        self.update_instances.add(obj.id.original)
-                        self.update_geometry_node_instances(obj.id)
-                        self.do_delete = False
-                        if rman_type == 'LIGHT':
-                            # check if portals are attached
-                            self.update_portals(obj.id.original)
-
-                    # Check if this object is the focus object the camera. If it is
-                    # we need to update the camera
-                    rman_sg_camera = self.rman_scene.main_camera
-                    if rman_sg_camera.rman_focus_object and rman_sg_camera.rman_focus_object == rman_sg_node:
-                        translator = self.rman_scene.rman_translators['CAMERA']
-                        with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):
-                            cam_object = translator.find_scene_camera()
-                            translator.update(cam_object, rman_sg_camera)
-
-                if obj.is_updated_geometry:
-                    if is_hidden:
-                        # don't update if this is hidden
+            elif isinstance(obj.id, bpy.types.Collection):
+                rfb_log().debug("Collection updated: %s" % obj.id.name)
+                dirty.collections[obj.id.original] = obj.id
+
+            else:
+                dirty.instancers[obj.id.original] = obj.id
+
+        return dirty
+
+    def _obj_transform_updated(self, obj, rman_type, rman_sg_node):
+        ob = obj.id
+        rfb_log().debug("Transform updated: %s" % obj.id.name)                  
+        if ob.type in ['CAMERA']:
+            # we deal with main camera transforms in view_draw
+            rman_sg_camera = self.rman_scene.rman_cameras[ob.original]
+            if rman_sg_camera == self.rman_scene.main_camera:
+                return
+            translator = self.rman_scene.rman_translators['CAMERA']
+            with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):
+                translator._update_render_cam_transform(ob, rman_sg_camera)                        
+            return
+        
+        if rman_type == 'LIGHTFILTER':
+            self._light_filter_transform_updated(obj)
+        elif rman_type == 'GPENCIL':
+            # FIXME: we shouldn't handle this specifically, but we seem to be
+            # hitting a prman crash when removing and adding instances of
+            # grease pencil curves
+            self._gpencil_transform_updated(obj)
+        elif rman_type == 'EMPTY':
+            self.update_empty(ob, rman_sg_node)
+        elif self.num_instances_changed:
+            rman_sg_node = self.rman_scene.rman_objects.get(obj.id.original, None)
+            for instance_obj in rman_sg_node.objects_instanced:
+                self.clear_instances(instance_obj)
+                self.update_instances.add(instance_obj)
+            rman_sg_node.objects_instanced.clear()                            
+        else:
+            # This is a simple transform. We don't clear the instances.
+
+            # We always have to update particle systems when the object has transformed
+            # A transform changed can also be triggered when a particle system is removed.        
+            self.update_particles.add(obj.id)                        
+            self.update_instances.add(obj.id.original)
+            self.update_geometry_node_instances(obj.id)
+            self.do_delete = False
+            if rman_type == 'LIGHT':
+                # check if portals are attached
+                self.update_portals(obj.id.original)
+
+        # Check if this object is the focus object the camera. If it is
+        # we need to update the camera
+        rman_sg_camera = self.rman_scene.main_camera
+        if rman_sg_camera.rman_focus_object and rman_sg_camera.rman_focus_object == rman_sg_node:
+            translator = self.rman_scene.rman_translators['CAMERA']
+            with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):
+                cam_object = translator.find_scene_camera()
+                translator.update(cam_object, rman_sg_camera)
+
+    def _obj_data_updated(self, obj, particle_settings):
+        rfb_log().debug("Object updated: %s" % obj.id.name)
+        particle_systems = getattr(obj.id, 'particle_systems', list())
+        if len(particle_systems) > 0 and particle_settings:
+            self.do_delete = False
+            for particle_settings_node in particle_settings:
+                self.update_particle_settings(obj, particle_settings_node)
+        else:
+            # We always update particle systems in the non-num_instance_change case
+            # because the particle system can be pointing to a whole new particle settings
+            self.update_particles.add(obj.id)
+
+            if not self.num_instances_changed:
+                self._obj_geometry_updated(obj)
+
+    def _obj_updated(self, entry, particle_settings):
+        obj, rman_type, rman_sg_node, is_hidden = entry
+        if obj.is_updated_transform:
+            self._obj_transform_updated(obj, rman_type, rman_sg_node)
+            if obj.id.type == 'CAMERA':
+                # camera transforms are all we need to do; for the main camera
+                # the rest is dealt with in view_draw
+                return
+        if obj.is_updated_geometry and not is_hidden:
+            self._obj_data_updated(obj, particle_settings)
+
+    def _camera_updated(self, obj):
+        if self.rman_scene.is_viewport_render:
+            if self.rman_scene.bl_scene.camera.data != obj.id:
+                return
+            rman_sg_camera = self.rman_scene.main_camera
+            translator = self.rman_scene.rman_translators['CAMERA']
+            with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):
+                translator.update_viewport_cam(self.rman_scene.bl_scene.camera, rman_sg_camera, force_update=True)       
+        else:
+            translator = self.rman_scene.rman_translators['CAMERA']                 
+            with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):
+                for ob, rman_sg_camera in self.rman_scene.rman_cameras.items():     
+                    if ob.original.name != obj.id.name:
                         continue
+                    translator._update_render_cam(ob.original, rman_sg_camera)
 
-                    rfb_log().debug("Object updated: %s" % obj.id.name)
-                    if has_particle_systems and particle_settings_node:
-                        self.do_delete = False
-                        self.update_particle_settings(obj, particle_settings_node)
-                    else:
-                        # We always update particle systems in the non-num_instance_change case
-                        # because the particle system can be pointing to a whole new particle settings
-                        self.update_particles.add(obj.id)
+    def _process_dirty_sets(self, dirty):
+        '''Process each of the dirty sets once, in dependency order.
+        '''
+        if dirty.scene:
+            self._scene_updated()
 
-                        if not self.num_instances_changed:
-                            self._obj_geometry_updated(obj)
+        if dirty.world:
+            with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene): 
+                self.rman_scene.export_integrator()
+                self.rman_scene.export_samplefilters()
+                self.rman_scene.export_displayfilters()
+                self.rman_scene.export_viewport_stats()
+
+        # materials go first, so that objects attach the updated materials
+        for obj in dirty.materials.values():
+            self._material_updated(obj)
+
+        # update all of the users of our fake node groups
+        if dirty.node_groups:
+            users = self.rman_scene.context.blend_data.user_map(subset=dirty.node_groups)
+            for node_group in dirty.node_groups:
+                for o in users[node_group]:
+                    if hasattr(o, 'rman_nodetree'):
+                        o.rman_nodetree.update_tag()
+                    elif hasattr(o, 'node_tree'):
+                        o.node_tree.update_tag()
+
+        if dirty.new_lightfilters:
+            self.add_objects(dirty.new_lightfilters)
+            self.num_instances_changed = False
+
+        # visibility changes clear and re-emit all instances, so there's
+        # no need to look at the transform or geometry of these objects
+        for ob_key, entry in dirty.visibility.items():
+            obj, rman_type, rman_sg_node, is_hidden = entry
+            db_name = object_utils.get_db_name(obj.id, rman_type=rman_type)
+            self.rman_scene.rman_objects.update_db_name(ob_key, db_name)
+            if self.update_object_visibility(rman_sg_node, obj.id):
+                dirty.discard(ob_key)
+
+        # light filters before lights, so lights see the updated filters
+        for entry in sorted(dirty.lights.values(), key=lambda entry: entry[1] != 'LIGHTFILTER'):
+            self._obj_updated(entry, dirty.particle_settings)
+
+        for obj, rman_type, rman_sg_node, is_hidden in dirty.transforms.values():
+            self._obj_transform_updated(obj, rman_type, rman_sg_node)
+
+        for obj, rman_type, rman_sg_node, is_hidden in dirty.geometry.values():
+            self._obj_data_updated(obj, dirty.particle_settings)
+
+        # don't check the collections if we know objects
+        # were added or deleted in the scene.
+        if not (self.do_delete or self.do_add):
+            for coll in dirty.collections.values():
+                self.update_collection(coll)
+
+        for instancer in dirty.instancers.values():
+            if isinstance(instancer, bpy.types.Object):
+                # newly added empty instancer
+                self.update_empty(instancer)
+            else:
+                self.update_geometry_node_instances(instancer)
 
-            elif isinstance(obj.id, bpy.types.Collection):
-                # don't check the collection if we know objects
-                # were added or deleted in the scene.
-                if self.do_delete or self.do_add:
-                    continue
+        # cameras go last, as their focus object may have moved
+        for ob_key, entry in dirty.cameras.items():
+            if isinstance(entry[0].id, bpy.types.Camera):
+                self._camera_updated(entry[0])
+            else:
+                self._obj_updated(entry, dirty.particle_settings)
+
+    def update_scene(self, context, depsgraph, updates=None):
+
+        if updates is None:
+            updates = depsgraph.updates
+
+        self.new_objects.clear() 
+        self.new_cameras.clear()
+        self.update_instances.clear()
+        self.update_particles.clear()
+        self.updated_instancers.clear()
+
+        self.do_delete = False # whether or not we need to do an object deletion
+        self.do_add = False # whether or not we need to add an object
+        self.num_instances_changed = False # if the number of instances has changed since the last update
                 
-                rfb_log().debug("Collection updated: %s" % obj.id.name)
-                self.update_collection(obj.id)
+        self.rman_scene.depsgraph = depsgraph
+        self.rman_scene.bl_scene = depsgraph.scene
+        self.rman_scene.context = context           
 
+        prev_num_instances = self.rman_scene.num_object_instances # the number of instances previously
+        
+        # Check the number of instances. If we differ, an object may have been
+        # added or deleted
+        if self.rman_scene.num_object_instances != len(depsgraph.object_instances):
+            self.num_instances_changed = True
+            if self.rman_scene.num_object_instances > len(depsgraph.object_instances):
+                self.do_delete = True
             else:
-                self.update_geometry_node_instances(obj.id)
+                self.do_add = True
+            self.rman_scene.num_object_instances = len(depsgraph.object_instances)
+            # objects were added or removed, so metaball families
+            # need to be re-indexed
+            self.rman_scene.meta_families = None
+
+        rfb_log().debug("------Start update scene--------")
+        dirty = self._classify_updates(updates)
+        rfb_log().debug("Dirty sets: %s" % dirty)
+
+        self._process_dirty_sets(dirty)
 
         # call txmake all in case of new textures
         texture_utils.get_txmanager().txmake_all(blocking=False)       
         # add new objs:
         if self.new_objects:
             self.add_objects()
-        elif self.do_add:
+        elif self.do_add and not dirty.retry_add:
             # if we didn't detect any new objects, but the number of
             # instances changed, check our existing objects for object
             # deletion and/or visibility
@@ -877,14 +1171,21 @@ class RmanSceneSync(object):
         self.update_particle_systems()
 
         # re-emit any instances needed
-        self.reemit_instances()                          
+        self.reemit_instances()
+
+        if dirty.retry_add:
+            # an object was added that we can't translate just yet,
+            # make sure we look for it again on the next update
+            self.rman_scene.num_object_instances = prev_num_instances                          
                         
         rfb_log().debug("------End update scene----------")
 
-    def add_objects(self):
+    def add_objects(self, obs=None):
+        if obs is None:
+            obs = self.new_objects
         with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene): 
             rfb_log().debug("Adding new objects:")
-            self.rman_scene.export_data_blocks(self.new_objects)
+            self.rman_scene.export_data_blocks(obs)
 
             self.rman_scene.scene_any_lights = self.rman_scene._scene_has_lights()
             if self.rman_scene.scene_any_lights:
@@ -920,6 +1221,7 @@ class RmanSceneSync(object):
 
                     # self.rman_scene.sg_scene.DeleteDagNode(rman_sg_node.sg_node)                     
                     del self.rman_scene.rman_objects[obj]
+                    self.rman_scene.unindex_object(obj)
 
                     # We just deleted a light filter. We need to tell all lights
                     # associated with this light filter to update
@@ -929,11 +1231,7 @@ class RmanSceneSync(object):
                             rman_sg_light = self.rman_scene.rman_objects.get(light_ob.original, None)
                             if rman_sg_light:
                                 self.rman_scene.rman_translators['LIGHT'].update_light_filters(light_ob, rman_sg_light)                                
-                    try:
-                        self.rman_scene.processed_obs.remove(obj)
-                    except ValueError:
-                        rfb_log().debug("Obj not in self.rman_scene.processed_obs: %s")
-                        pass
+                    self.rman_scene.processed_obs.discard(obj)
 
                 if self.rman_scene.render_default_light:
                     self.rman_scene.scene_any_lights = self.rman_scene._scene_has_lights()     
@@ -1008,6 +1306,9 @@ class RmanSceneSync(object):
         translator = self.rman_scene.rman_translators["MATERIAL"]     
         has_meshlight = rman_sg_material.has_meshlight   
         rfb_log().debug("Manual material update called for: %s." % mat.name)
+        # manual updates always do a full rebuild of the material, in case
+        # an edit was missed
+        rman_sg_material.nodetree_signature = None
         with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene):                  
             translator.update(mat, rman_sg_material)
 
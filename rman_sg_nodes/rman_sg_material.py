@@ -10,6 +10,8 @@ class RmanSgMaterial(RmanSgNode):
         self.sg_stroke_mat = None
         self.sg_fill_mat = None
         self.nodes_to_blnodeinfo = dict()
+        self.nodetree_signature = None # topology of the node tree at the last full export
+        self.shader_terminals = dict() # terminal -> (shading nodes, parameters), see RmanMaterialTranslator.record_shader_terminal
 
     @property
     def has_meshlight(self):
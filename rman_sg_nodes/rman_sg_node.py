@@ -11,11 +11,15 @@ class RmanSgNode(object):
         motion_steps (list) - the full list of deformation time samples that are required for this Blender object        
         is_transforming (bool) - if this object is moving
         is_deforming (bool) - if this object is deforming
+        use_velocity_blur (bool) - deformation samples are derived from a velocity attribute, rather than
+                                   evaluating the object at each sample
         rman_type (str) - the renderman type for this object
         is_instancer (bool) - whether this object is instancer 
         is_meshlight (bool) - if this object is a mesh light.
         is_hidden (bool) - whether this object is considered hidden
         is_frame_sensitive (bool) - indicates that the sg_node should be updated on frame changes
+        is_shared_geometry (bool) - whether this node is a geometry prototype shared by several objects
+        fingerprint (bytes) - fingerprint of the data last translated into sg_node (see RmanTranslator.get_fingerprint)
  
     '''
     def __init__(self, rman_scene, sg_node, db_name):
@@ -27,6 +31,7 @@ class RmanSgNode(object):
         self.deform_motion_steps = []
         self.is_transforming = False
         self.is_deforming = False
+        self.use_velocity_blur = False
         self.rman_type = ''
         self.is_instancer = False
         self.is_meshlight = False
@@ -53,6 +58,14 @@ class RmanSgNode(object):
         # psys
         self.bl_psys_settings = None
 
+        # this node's geometry is shared between all objects
+        # that use the same datablock
+        self.is_shared_geometry = False
+
+        # fingerprint of the data last translated into this node.
+        # Used during IPR to skip re-translating unchanged geometry
+        self.fingerprint = None
+
     @property
     def rman_scene(self):
         return self.__rman_scene
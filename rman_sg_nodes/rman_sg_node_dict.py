@@ -0,0 +1,78 @@
+class RmanSgNodeDict(dict):
+    '''
+    A dictionary of RmanSgNodes, keyed by their Blender datablock, that also keeps
+    a reverse index from db_name to keys. The index is maintained as nodes are added
+    and removed, so that after an undo, when all of the bpy.types.ID keys have been
+    invalidated, a node can still be found by its db_name without scanning the whole dictionary.
+
+    Changing the db_name of a node that is already in the dictionary has to go through
+    update_db_name, so the index stays in sync.
+
+    Attributes:
+        db_names (dict) - db_name -> dict of keys with a node of that db_name, in insertion order
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self.db_names = dict()
+
+    def _index(self, key, rman_sg_node):
+        if rman_sg_node is None:
+            return
+        self.db_names.setdefault(rman_sg_node.db_name, dict())[key] = True
+
+    def _unindex(self, key, rman_sg_node):
+        if rman_sg_node is None:
+            return
+        keys = self.db_names.get(rman_sg_node.db_name, None)
+        if keys is None:
+            return
+        keys.pop(key, None)
+        if not keys:
+            del self.db_names[rman_sg_node.db_name]
+
+    def __setitem__(self, key, rman_sg_node):
+        self._unindex(key, self.get(key, None))
+        super().__setitem__(key, rman_sg_node)
+        self._index(key, rman_sg_node)
+
+    def __delitem__(self, key):
+        rman_sg_node = self[key]
+        super().__delitem__(key)
+        self._unindex(key, rman_sg_node)
+
+    def pop(self, key, *args):
+        if key not in self:
+            return super().pop(key, *args)
+        rman_sg_node = super().pop(key)
+        self._unindex(key, rman_sg_node)
+        return rman_sg_node
+
+    def clear(self):
+        super().clear()
+        self.db_names.clear()
+
+    def update_db_name(self, key, db_name):
+        '''Change the db_name of the node stored at key
+        '''
+        rman_sg_node = self[key]
+        if rman_sg_node.db_name == db_name:
+            return
+        self._unindex(key, rman_sg_node)
+        rman_sg_node.db_name = db_name
+        self._index(key, rman_sg_node)
+
+    def find_by_db_name(self, db_name):
+        '''Find the node with db_name
+
+        Returns:
+            (tuple) - the key and the node, or (None, None) if there is no such node
+        '''
+        keys = self.db_names.get(db_name, None)
+        if not keys:
+            return (None, None)
+        for key in keys:
+            rman_sg_node = self.get(key, None)
+            if rman_sg_node is not None and rman_sg_node.db_name == db_name:
+                return (key, rman_sg_node)
+        return (None, None)
@@ -4,14 +4,8 @@ from ..rfb_utils import object_utils
 from ..rfb_utils import string_utils
 from mathutils import Matrix
 
-import bpy
 import math
 
-def get_mball_parent(mball):
-    for ob in bpy.data.objects:
-        if ob.data == mball:
-            return ob
-
 class RmanBlobbyTranslator(RmanTranslator):
 
     def __init__(self, rman_scene):
@@ -34,55 +28,47 @@ class RmanBlobbyTranslator(RmanTranslator):
         rm = ob.renderman
         prim = rm.primitive
 
-        # we are searching the global metaball collection for all mballs
-        # linked to the current object context, so we can export them
+        # we are using the metaball family index of the scene to find all
+        # of the mballs linked to the current object context, so we can export them
         # all as one family in RiBlobby
 
         family = object_utils.get_meta_family(ob)
-        master = bpy.data.objects[family]
-
-        fam_blobs = []
-
-        for mball in bpy.data.metaballs:
-            fam_blobs.extend([el for el in mball.elements if get_mball_parent(
-                el.id_data).name.split('.')[0] == family])
+        members = self.rman_scene.get_meta_family_members(family)
 
         # transform
         tform = []
 
         # opcodes
         op = []
-        count = len(fam_blobs)
-        for i in range(count):
-            op.append(1001)  # only blobby ellipsoids for now...
-            op.append(i * 16)
+        count = 0
 
-        for meta_el in fam_blobs:
+        for parent, mball in members:
 
             # Because all meta elements are stored in a single collection,
             # these elements have a link to their parent MetaBall, but NOT the actual tree parent object.
-            # So I have to go find the parent that owns it.  We need the tree parent in order
+            # The family index gives us the parent that owns it.  We need the tree parent in order
             # to get any world transforms that alter position of the metaball.
-            parent = get_mball_parent(meta_el.id_data)
-
-            m = {}
-            loc = meta_el.co
-
-            # mballs that are only linked to the master by name have their own position,
-            # and have to be transformed relative to the master
             ploc, prot, psc = parent.matrix_world.decompose()
+            ro = prot.to_matrix().to_4x4()
 
-            m = Matrix.Translation(loc)
+            for meta_el in mball.elements:
+                op.append(1001)  # only blobby ellipsoids for now...
+                op.append(count * 16)
+                count += 1
 
-            sc = Matrix(((meta_el.radius, 0, 0, 0),
-                        (0, meta_el.radius, 0, 0),
-                        (0, 0, meta_el.radius, 0),
-                        (0, 0, 0, 1)))
+                loc = meta_el.co
 
-            ro = prot.to_matrix().to_4x4()
+                # mballs that are only linked to the master by name have their own position,
+                # and have to be transformed relative to the master
+                m = Matrix.Translation(loc)
+
+                sc = Matrix(((meta_el.radius, 0, 0, 0),
+                            (0, meta_el.radius, 0, 0),
+                            (0, 0, meta_el.radius, 0),
+                            (0, 0, 0, 1)))
 
-            m2 = m @ sc @ ro
-            tform = tform + string_utils.convert_val(parent.matrix_world @ m2)
+                m2 = m @ sc @ ro
+                tform.extend(string_utils.convert_val(parent.matrix_world @ m2))
 
         op.append(0)  # blob operation:add
         op.append(count)
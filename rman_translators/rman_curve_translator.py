@@ -3,87 +3,97 @@ from ..rman_sg_nodes.rman_sg_curve import RmanSgCurve
 from ..rfb_utils import object_utils
 from ..rfb_utils import string_utils
 from ..rfb_utils import property_utils
+from ..rfb_utils import scenegraph_utils
 
 import bpy
 import math
-
-def get_bspline_curve(curve):
-    P = []
-    widths = []
-    nvertices = []
+import numpy as np
+
+def _get_spline_points_(curve):
+    # Gather the points and radii of all splines with one foreach_get
+    # per spline, straight into slices of the combined arrays
+    splines = curve.splines
+    num_curves = len(splines)
+    nvertices = np.array([len(spline.points) for spline in splines], dtype=np.int32)
+    offsets = np.zeros(num_curves + 1, dtype=np.int64)
+    np.cumsum(nvertices, out=offsets[1:])
+
+    co = np.zeros((offsets[-1], 4), dtype=np.float32)
+    radius = np.zeros(offsets[-1], dtype=np.float32)
     name = ''
-    num_curves = len(curve.splines)
-    index = []
-
-    for i, spline in enumerate(curve.splines):
-
-        width = []
-        for bp in spline.points:
-            P.append([bp.co[0], bp.co[1], bp.co[2]])
-            w = bp.radius * 0.01
-            if w < 0.01:
-                w = 0.01
-            width.extend( 3 * [w])  
-
-        widths.append(width)
-        index.append(i)
-        nvertices.append(len(spline.points))
+    for i, spline in enumerate(splines):
+        start, end = offsets[i], offsets[i+1]
+        spline.points.foreach_get('co', co[start:end].reshape(-1))
+        spline.points.foreach_get('radius', radius[start:end])
         name = spline.id_data.name
-    
+
+    P = np.ascontiguousarray(co[:, :3])
+    widths = np.maximum(radius * 0.01, 0.01)
+    index = np.arange(num_curves, dtype=np.int32)
+
     return (P, num_curves, nvertices, widths, index, name)
 
+def get_bspline_curve(curve):
+    return _get_spline_points_(curve)
+
 def get_curve(curve):
-    P = []
-    widths = []
-    nvertices = []
-    name = ''
-    num_curves = len(curve.splines)
-    index = []
-
-    for i, spline in enumerate(curve.splines):
-
-        width = []
-        for bp in spline.points:
-            P.append([bp.co[0], bp.co[1], bp.co[2]])
-            w = bp.radius * 0.01
-            if w < 0.01:
-                w = 0.01
-            width.extend( 3 * [w])  
-
-        widths.append(width)
-        index.append(i)
-        nvertices.append(len(spline.points))
-        name = spline.id_data.name
-    
-    return (P, num_curves, nvertices, widths, index, name)
+    return _get_spline_points_(curve)
 
 def get_bezier_curve(curve):
-    splines = []
-
+    # Bezier splines are gathered into one curve set for nonperiodic
+    # splines, and one for periodic splines
+    groups = dict()
+    name = ''
     for spline in curve.splines:
-        P = []
-        width = []
-
-        for bp in spline.bezier_points:
-            P.append(bp.handle_left)
-            P.append(bp.co)
-            P.append(bp.handle_right)
-            width.extend( 3 * [bp.radius * 0.01])
-
+        name = spline.id_data.name
+        num_pts = len(spline.bezier_points)
         if spline.use_cyclic_u:
-            period = 'periodic'
+            if num_pts < 1:
+                continue
+            groups.setdefault('periodic', []).append(spline)
+        else:
+            if num_pts < 2:
+                continue
+            groups.setdefault('nonperiodic', []).append(spline)
+
+    curves = []
+    for period, splines in groups.items():
+        counts = np.array([len(spline.bezier_points) for spline in splines], dtype=np.int64)
+        offsets = np.zeros(len(splines) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        total = offsets[-1]
+
+        # for each bezier point, its left handle, control point and right handle
+        cvs = np.zeros((3, total, 3), dtype=np.float32)
+        radius = np.zeros(total, dtype=np.float32)
+        for i, spline in enumerate(splines):
+            start, end = offsets[i], offsets[i+1]
+            for j, attr in enumerate(['handle_left', 'co', 'handle_right']):
+                spline.bezier_points.foreach_get(attr, cvs[j, start:end].reshape(-1))
+            spline.bezier_points.foreach_get('radius', radius[start:end])
+
+        cvs = np.ascontiguousarray(cvs.transpose(1, 0, 2)).reshape(-1, 3)
+        width = np.repeat(radius * 0.01, 3)
+
+        # position of each vertex within its own spline
+        spline_starts = np.repeat(3 * offsets[:-1], 3 * counts)
+        local = np.arange(3 * total) - spline_starts
+
+        if period == 'periodic':
             # wrap the initial handle around to the end, to begin on the CV
-            P = P[1:] + P[:1]
+            spline_lengths = np.repeat(3 * counts, 3 * counts)
+            P = cvs[spline_starts + (local + 1) % spline_lengths]
+            nvertices = (3 * counts).astype(np.int32)
         else:
-            period = 'nonperiodic'
             # remove the two unused handles
-            P = P[1:-1]
-            width = width[1:-1]
+            keep = (local != 0) & (local != np.repeat(3 * counts - 1, 3 * counts))
+            P = cvs[keep]
+            width = width[keep]
+            nvertices = (3 * counts - 2).astype(np.int32)
 
-        name = spline.id_data.name
-        splines.append((P, width, period, name))
+        curves.append((P, width, nvertices, period, name))
 
-    return splines      
+    return curves
 
 
 def get_is_cyclic(curve):
@@ -149,6 +159,8 @@ class RmanCurveTranslator(RmanMeshTranslator):
         rman_sg_curve.is_mesh = self._is_mesh(ob)
 
         if rman_sg_curve.is_mesh:
+            # we always create a new mesh node, so the old fingerprint doesn't apply
+            rman_sg_curve.fingerprint = None
             rman_sg_curve.sg_mesh_node = self.rman_scene.sg_scene.CreateMesh('%s-MESH' % rman_sg_curve.db_name)
             rman_sg_curve.sg_node.AddChild(rman_sg_curve.sg_mesh_node)            
             super().update(ob, rman_sg_curve, sg_node=rman_sg_curve.sg_mesh_node)
@@ -170,11 +182,11 @@ class RmanCurveTranslator(RmanMeshTranslator):
         curves_sg.Define(self.rman_scene.rman.Tokens.Rix.k_cubic, 'nonperiodic', "b-spline", num_curves, num_pts)
         
         primvar = curves_sg.GetPrimVars()
-        primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")   
-        primvar.SetIntegerDetail(self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, nvertices, "uniform")
-        if widths:
-            primvar.SetFloatDetail(self.rman_scene.rman.Tokens.Rix.k_width, widths, "vertex")
-        primvar.SetIntegerDetail("index", index, "uniform")
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetIntegerDetail', self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, nvertices, "uniform")
+        if len(widths):
+            scenegraph_utils.set_primvar_bulk_data(primvar, 'SetFloatDetail', self.rman_scene.rman.Tokens.Rix.k_width, widths, "vertex")
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetIntegerDetail', "index", index, "uniform")
         curves_sg.SetPrimVars(primvar)     
 
         rman_sg_curve.sg_node.AddChild(curves_sg)                       
@@ -187,29 +199,29 @@ class RmanCurveTranslator(RmanMeshTranslator):
         curves_sg.Define(self.rman_scene.rman.Tokens.Rix.k_linear, 'nonperiodic', "linear", num_curves, num_pts)
         
         primvar = curves_sg.GetPrimVars()
-        primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")   
-        primvar.SetIntegerDetail(self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, nvertices, "uniform")
-        if widths:
-            primvar.SetFloatDetail(self.rman_scene.rman.Tokens.Rix.k_width, widths, "vertex")
-        primvar.SetIntegerDetail("index", index, "uniform")
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetIntegerDetail', self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, nvertices, "uniform")
+        if len(widths):
+            scenegraph_utils.set_primvar_bulk_data(primvar, 'SetFloatDetail', self.rman_scene.rman.Tokens.Rix.k_width, widths, "vertex")
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetIntegerDetail', "index", index, "uniform")
         curves_sg.SetPrimVars(primvar)     
 
         rman_sg_curve.sg_node.AddChild(curves_sg)          
 
     def update_bezier_curve(self, ob, rman_sg_curve):
         curves = get_bezier_curve(ob.data)
-        for P, width, period, name in curves:
+        for P, width, nvertices, period, name in curves:
             num_pts = len(P)
             if num_pts < 1:
                 continue
             curves_sg = self.rman_scene.sg_scene.CreateCurves(name)
-            curves_sg.Define(self.rman_scene.rman.Tokens.Rix.k_cubic, period, "bezier", 1, num_pts)
+            curves_sg.Define(self.rman_scene.rman.Tokens.Rix.k_cubic, period, "bezier", len(nvertices), num_pts)
             
             primvar = curves_sg.GetPrimVars()
-            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")   
-            primvar.SetIntegerDetail(self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, [num_pts], "uniform")
-            if width:
-                primvar.SetFloatDetail(self.rman_scene.rman.Tokens.Rix.k_width, width, "vertex")
+            scenegraph_utils.set_primvar_bulk_data(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")
+            scenegraph_utils.set_primvar_bulk_data(primvar, 'SetIntegerDetail', self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, nvertices, "uniform")
+            if len(width):
+                scenegraph_utils.set_primvar_bulk_data(primvar, 'SetFloatDetail', self.rman_scene.rman.Tokens.Rix.k_width, width, "vertex")
             curves_sg.SetPrimVars(primvar)
 
-            rman_sg_curve.sg_node.AddChild(curves_sg)        
\ No newline at end of file
+            rman_sg_curve.sg_node.AddChild(curves_sg)
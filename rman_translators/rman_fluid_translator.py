@@ -6,23 +6,40 @@ from ..rfb_utils import string_utils
 from ..rfb_utils import scenegraph_utils
 from ..rfb_utils import particles_utils
 from ..rfb_utils import object_utils
+from ..rfb_utils import filepath_utils
 from ..rfb_logger import rfb_log
 import bpy
 import os
+import numpy as np
+
+def get_fluid_grid(fluid_data, name, components=1):
+    '''Read one of the dense grids of a fluid domain into a float32 NumPy array
+
+    Args:
+        fluid_data (bpy.types.FluidDomainSettings) - the fluid domain settings
+        name (str) - name of the grid, ex: 'density_grid'
+        components (int) - number of components per cell
+
+    Returns:
+        (numpy.ndarray) - the grid, with shape (cells, components) if components > 1
+    '''
+    grid = getattr(fluid_data, name)
+    try:
+        arr = np.zeros(len(grid), dtype=np.float32)
+        grid.foreach_get(arr)
+    except AttributeError:
+        # bpy_prop_array.foreach_get is not available in older versions of Blender
+        arr = np.array(grid, dtype=np.float32)
+    if components > 1:
+        arr = arr.reshape(-1, components)
+    return arr
 
 def locate_openVDB_cache(cache_dir, frameNum):
     if not bpy.data.is_saved:
         return None
     cacheDir = os.path.join(bpy.path.abspath(cache_dir), 'data')
-    if not os.path.exists(cacheDir):
-        return None
-    for f in os.listdir(cacheDir):
-        if os.path.splitext(f)[1] != '.vdb':
-            continue
-        if 'density' in f and "%04d" % frameNum in f:
-            return os.path.join(cacheDir, f)
-
-    return None
+    frames = filepath_utils.get_frame_files(cacheDir, '.vdb', match='density')
+    return frames.get(frameNum, None)
 
 def find_fluid_modifier(ob):
     fluid_modifier = None
@@ -128,9 +145,10 @@ class RmanFluidTranslator(RmanTranslator):
         inv_mtx = ob.matrix_world.inverted_safe()
         cur_frame = self.rman_scene.bl_scene.frame_current
         do_motion = self.rman_scene.do_motion_blur
-        P, next_P, width = particles_utils.get_particles(ob, psys, inv_mtx, cur_frame, get_next_P=do_motion)        
+        snapshot = particles_utils.ParticlesSnapshot(psys)
+        P, next_P, width = particles_utils.get_particles(ob, psys, inv_mtx, cur_frame, get_next_P=do_motion, snapshot=snapshot)        
 
-        if not P:
+        if len(P) < 1:
             return
 
         nm_pts = len(P)
@@ -142,14 +160,14 @@ class RmanFluidTranslator(RmanTranslator):
         if do_motion and rman_sg_fluid.motion_steps:
             super().set_primvar_times(rman_sg_fluid.motion_steps, primvar)
         
-        particles_utils.get_primvars_particle(primvar, cur_frame, psys, [cur_frame], 0)      
+        particles_utils.get_primvars_particle(primvar, cur_frame, psys, [cur_frame], 0, snapshot=snapshot)      
         
         if do_motion:
-            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex", 0) 
-            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, next_P, "vertex", 1)  
+            scenegraph_utils.set_primvar_bulk_data(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex", 0) 
+            scenegraph_utils.set_primvar_bulk_data(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, next_P, "vertex", 1)  
         else:
-            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")               
-        primvar.SetFloatDetail(self.rman_scene.rman.Tokens.Rix.k_width, width, "vertex")
+            scenegraph_utils.set_primvar_bulk_data(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")               
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetFloatDetail', self.rman_scene.rman.Tokens.Rix.k_width, width, "vertex")
 
         sg_node.SetPrimVars(primvar)
 
@@ -193,12 +211,14 @@ class RmanFluidTranslator(RmanTranslator):
         primvar.SetString(self.rman_scene.rman.Tokens.Rix.k_Ri_type, "box")
         primvar.SetFloatArray(self.rman_scene.rman.Tokens.Rix.k_Ri_Bound, transform_utils.convert_ob_bounds(ob.bound_box), 6)
 
-        primvar.SetFloatDetail("density", fluid_data.density_grid, "varying")
-        primvar.SetFloatDetail("flame", fluid_data.flame_grid, "varying")   
-        primvar.SetFloatDetail("heat", fluid_data.heat_grid, "varying")
-        primvar.SetColorDetail("color", [item for index, item in enumerate(fluid_data.color_grid) if index % 4 != 0], "varying")
-        primvar.SetVectorDetail("velocity", fluid_data.velocity_grid, "varying")
-        primvar.SetFloatDetail("temperature", fluid_data.temperature_grid, "varying")
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetFloatDetail', "density", get_fluid_grid(fluid_data, 'density_grid'), "varying")
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetFloatDetail', "flame", get_fluid_grid(fluid_data, 'flame_grid'), "varying")
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetFloatDetail', "heat", get_fluid_grid(fluid_data, 'heat_grid'), "varying")
+        # color_grid is RGBA, drop the alpha
+        color = np.ascontiguousarray(get_fluid_grid(fluid_data, 'color_grid', components=4)[:, :3])
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetColorDetail', "color", color, "varying")
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetVectorDetail', "velocity", get_fluid_grid(fluid_data, 'velocity_grid', components=3), "varying")
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetFloatDetail', "temperature", get_fluid_grid(fluid_data, 'temperature_grid'), "varying")
 
         rman_sg_fluid.rman_sg_volume_node.SetPrimVars(primvar)  
 
@@ -211,6 +211,10 @@ class RmanGPencilTranslator(RmanTranslator):
 
         gp_ob = ob.data
 
+        if ob.renderman.rman_gpencil_batch_strokes:
+            self._get_strokes_batched_(ob, rman_sg_gpencil)
+            return
+
         j = 0
         for nm,lyr in gp_ob.layers.items():
             if lyr.hide:
@@ -240,4 +244,196 @@ class RmanGPencilTranslator(RmanTranslator):
                     else:
                         self._create_curve(ob, j, lyr, stroke, rman_sg_gpencil, rman_sg_material, adjust_point=_ADJUST_POINT_)               
                 i +=1
-            j += 1
\ No newline at end of file
+            j += 1
+
+    def _gather_points_(self, strokes, attr=None):
+        # Gather the points of all strokes into one array, using a
+        # single foreach_get per stroke into a slice of the result.
+        # Also returns the per stroke point offsets and, optionally,
+        # the values of another point attribute
+        counts = [len(stroke.points) for i, stroke in strokes]
+        offsets = np.zeros(len(counts)+1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        P = np.zeros((offsets[-1], 3), dtype=np.float32)
+        values = np.zeros(offsets[-1], dtype=np.float32) if attr else None
+        for k, (i, stroke) in enumerate(strokes):
+            start, end = offsets[k], offsets[k+1]
+            stroke.points.foreach_get('co', P[start:end].reshape(-1))
+            if attr:
+                stroke.points.foreach_get(attr, values[start:end])
+        return P, offsets, values
+
+    def _adjust_points_(self, P, offsets, strokes):
+        # move each stroke a little bit towards the camera, by its stroke index
+        cam_pos, rot, sca = self.rman_scene.main_camera.bl_camera.matrix_world.decompose()
+        idx = np.repeat([i for i, stroke in strokes], np.diff(offsets)).astype(np.float32)
+        direction = np.array(cam_pos, dtype=np.float32) - P
+        length = np.linalg.norm(direction, axis=1)
+        length[length == 0.0] = 1.0
+        P += direction / length[:, None] * (idx * _BIAS_)[:, None]
+
+    def _create_batched_mesh(self, ob, lyr, strokes, rman_sg_gpencil, materials):
+        P, offsets, values = self._gather_points_(strokes)
+        if _ADJUST_POINT_:
+            self._adjust_points_(P, offsets, strokes)
+
+        st = None
+        if hasattr(strokes[0][1].points[0], 'uv_fill'):
+            st = np.zeros((len(P), 2), dtype=np.float32)
+
+        tris = []
+        mat_faces = dict()
+        num_polygons = 0
+        for k, (i, stroke) in enumerate(strokes):
+            start, end = offsets[k], offsets[k+1]
+            if st is not None:
+                stroke.points.foreach_get('uv_fill', st[start:end].reshape(-1))
+            num_tris = len(stroke.triangles)
+            stroke_tris = np.zeros((num_tris, 3), dtype=np.int32)
+            for col, v in enumerate(['v1', 'v2', 'v3']):
+                tri_col = np.zeros(num_tris, dtype=np.int32)
+                stroke.triangles.foreach_get(v, tri_col)
+                stroke_tris[:, col] = tri_col
+            tris.append((stroke_tris + start).astype(np.int32))
+            faces = mat_faces.setdefault(stroke.material_index, [])
+            faces.append(np.arange(num_polygons, num_polygons + num_tris, dtype=np.int32))
+            num_polygons += num_tris
+
+        verts = np.concatenate(tris).reshape(-1)
+        nverts = np.full(num_polygons, 3, dtype=np.int32)
+        num_pts = len(P)
+
+        mesh_sg = self.rman_scene.sg_scene.CreateMesh('%s-MESH' % lyr.info)
+        mesh_sg.Define( num_polygons, num_pts, len(verts) )
+        primvar = mesh_sg.GetPrimVars()
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetIntegerDetail', self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, nverts, "uniform")
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetIntegerDetail', self.rman_scene.rman.Tokens.Rix.k_Ri_vertices, verts, "facevarying")
+        if st is not None:
+            scenegraph_utils.set_primvar_bulk_data(primvar, 'SetFloatArrayDetail', "st", st, 2, "vertex")
+
+        # the first material goes on the mesh itself, the rest
+        # on sub-meshes that inherit the primvars, each with a faceset
+        for n, (mat_id, faces) in enumerate(mat_faces.items()):
+            faces = np.concatenate(faces)
+            rman_sg_material = materials[mat_id]
+            if n == 0:
+                if len(mat_faces) > 1:
+                    scenegraph_utils.set_primvar_bulk_data(primvar, 'SetIntegerArray', self.rman_scene.rman.Tokens.Rix.k_shade_faceset, faces, len(faces))
+                if rman_sg_material:
+                    scenegraph_utils.set_material(mesh_sg, rman_sg_material.sg_fill_mat)
+            else:
+                sg_sub_mesh = self.rman_scene.sg_scene.CreateMesh('%s-MESH-%d' % (lyr.info, mat_id))
+                sg_sub_mesh.Define( num_polygons, num_pts, len(verts) )
+                pvars = sg_sub_mesh.GetPrimVars()
+                pvars.Inherit(primvar)
+                scenegraph_utils.set_primvar_bulk_data(pvars, 'SetIntegerArray', self.rman_scene.rman.Tokens.Rix.k_shade_faceset, faces, len(faces))
+                sg_sub_mesh.SetPrimVars(pvars)
+                if rman_sg_material:
+                    scenegraph_utils.set_material(sg_sub_mesh, rman_sg_material.sg_fill_mat)
+                rman_sg_gpencil.sg_node.AddChild(sg_sub_mesh)
+
+        mesh_sg.SetPrimVars(primvar)
+        rman_sg_gpencil.sg_node.AddChild(mesh_sg)
+
+    def _create_batched_points(self, ob, lyr, mat_id, strokes, rman_sg_gpencil, rman_sg_material):
+        P, offsets, widths = self._gather_points_(strokes, attr='pressure')
+        if _ADJUST_POINT_:
+            self._adjust_points_(P, offsets, strokes)
+
+        line_widths = np.array([stroke.line_width for i, stroke in strokes], dtype=np.float32)
+        widths *= np.repeat(line_widths * 0.0012, np.diff(offsets))
+
+        points_sg = self.rman_scene.sg_scene.CreatePoints("%s-DOTS-%d" % (lyr.info, mat_id))
+        points_sg.Define(len(P))
+        primvar = points_sg.GetPrimVars()
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetFloatDetail', self.rman_scene.rman.Tokens.Rix.k_width, widths, "vertex")
+        points_sg.SetPrimVars(primvar)
+
+        if rman_sg_material:
+            scenegraph_utils.set_material(points_sg, rman_sg_material.sg_stroke_mat)
+
+        rman_sg_gpencil.sg_node.AddChild(points_sg)
+
+    def _create_batched_curves(self, ob, lyr, mat_id, strokes, rman_sg_gpencil, rman_sg_material):
+        P, offsets, widths = self._gather_points_(strokes, attr='pressure')
+        if _ADJUST_POINT_:
+            self._adjust_points_(P, offsets, strokes)
+
+        counts = np.diff(offsets)
+        line_widths = np.array([stroke.line_width for i, stroke in strokes], dtype=np.float32)
+        widths *= np.repeat(line_widths * 0.00083, counts)
+
+        # double the first and last point of every curve
+        num_curves = len(strokes)
+        idx = np.arange(len(P))
+        idx = np.insert(idx, offsets[:-1], offsets[:-1])
+        idx = np.insert(idx, offsets[1:] + np.arange(1, num_curves+1), offsets[1:] - 1)
+        P = P[idx]
+        widths = widths[idx]
+        nvertices = (counts + 2).astype(np.int32)
+
+        curves_sg = self.rman_scene.sg_scene.CreateCurves("%s-STROKE-%d" % (lyr.info, mat_id))
+        curves_sg.Define(self.rman_scene.rman.Tokens.Rix.k_cubic, "nonperiodic", "catmull-rom", num_curves, len(P))
+        primvar = curves_sg.GetPrimVars()
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetIntegerDetail', self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, nvertices, "uniform")
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetIntegerDetail', "index", np.arange(num_curves, dtype=np.int32), "uniform")
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetFloatDetail', self.rman_scene.rman.Tokens.Rix.k_width, widths, "vertex")
+        curves_sg.SetPrimVars(primvar)
+
+        if rman_sg_material:
+            scenegraph_utils.set_material(curves_sg, rman_sg_material.sg_stroke_mat)
+
+        rman_sg_gpencil.sg_node.AddChild(curves_sg)
+
+    def _get_strokes_batched_(self, ob, rman_sg_gpencil):
+        # Same as _get_strokes_, but rather than creating primitives for every
+        # stroke, merge the fills of a layer into one mesh, and the strokes
+        # of a layer into one curve set (or points) per material.
+
+        gp_ob = ob.data
+        materials = dict()
+
+        j = 0
+        for nm,lyr in gp_ob.layers.items():
+            if lyr.hide:
+                continue
+
+            frame = lyr.active_frame
+            if not frame:
+                continue
+
+            fills = []
+            curves = dict()
+            dots = dict()
+            for stroke in frame.strokes:
+                num_pts = len(stroke.points)
+                if num_pts < 1:
+                    continue
+                mat_id = stroke.material_index
+                mat = gp_ob.materials[mat_id]
+                if mat.grease_pencil.hide:
+                    continue
+                if mat_id not in materials:
+                    materials[mat_id] = self.rman_scene.rman_materials.get(mat.original, None)
+                rman_sg_material = materials[mat_id]
+
+                has_fill = len(stroke.triangles) > 0 and rman_sg_material and rman_sg_material.sg_fill_mat
+                if has_fill:
+                    fills.append((j, stroke))
+                if not has_fill or rman_sg_material.sg_stroke_mat:
+                    if mat.grease_pencil.mode in ['DOTS', 'BOX'] or num_pts < 2:
+                        # not enough points to be a curve. export as points
+                        dots.setdefault(mat_id, []).append((j, stroke))
+                    else:
+                        curves.setdefault(mat_id, []).append((j, stroke))
+                j += 1
+
+            if fills:
+                self._create_batched_mesh(ob, lyr, fills, rman_sg_gpencil, materials)
+            for mat_id, strokes in dots.items():
+                self._create_batched_points(ob, lyr, mat_id, strokes, rman_sg_gpencil, materials[mat_id])
+            for mat_id, strokes in curves.items():
+                self._create_batched_curves(ob, lyr, mat_id, strokes, rman_sg_gpencil, materials[mat_id])
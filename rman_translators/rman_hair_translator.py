@@ -32,13 +32,17 @@ class RmanHairTranslator(RmanTranslator):
     def export_deform_sample(self, rman_sg_hair, ob, psys, time_sample):
 
         curves = self._get_strands_(ob, psys)
-        for i, (vertsArray, points, widths, scalpST) in enumerate(curves):
+        if not curves:
+            return
+        for i, (vertsArray, points, widths, scalpST, mcols) in enumerate(curves):
+            if i >= len(rman_sg_hair.sg_curves_list):
+                break
             curves_sg = rman_sg_hair.sg_curves_list[i]
             if not curves_sg:
                 continue
             primvar = curves_sg.GetPrimVars()
 
-            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, points, "vertex", time_sample)  
+            scenegraph_utils.set_primvar_bulk_data(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, points, "vertex", time_sample)  
             curves_sg.SetPrimVars(primvar)
 
     def update(self, ob, psys, rman_sg_hair):
@@ -55,23 +59,23 @@ class RmanHairTranslator(RmanTranslator):
             curves_sg.Define(self.rman_scene.rman.Tokens.Rix.k_cubic, "nonperiodic", "catmull-rom", len(vertsArray), len(points))
             primvar = curves_sg.GetPrimVars()
 
-            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, points, "vertex")                
-            primvar.SetIntegerDetail(self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, vertsArray, "uniform")
+            scenegraph_utils.set_primvar_bulk_data(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, points, "vertex")                
+            scenegraph_utils.set_primvar_bulk_data(primvar, 'SetIntegerDetail', self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, vertsArray, "uniform")
             index_nm = psys.settings.renderman.hair_index_name
             if index_nm == '':
                 index_nm = 'index'
-            primvar.SetIntegerDetail(index_nm, range(len(vertsArray)), "uniform")
+            scenegraph_utils.set_primvar_bulk_data(primvar, 'SetIntegerDetail', index_nm, np.arange(len(vertsArray), dtype=np.int32), "uniform")
 
-            width_detail = "constant"
-            if isinstance(widths, list):
-                width_detail = "vertex"
-            primvar.SetFloatDetail(self.rman_scene.rman.Tokens.Rix.k_width, widths, width_detail)
+            if isinstance(widths, np.ndarray):
+                scenegraph_utils.set_primvar_bulk_data(primvar, 'SetFloatDetail', self.rman_scene.rman.Tokens.Rix.k_width, widths, "vertex")
+            else:
+                primvar.SetFloatDetail(self.rman_scene.rman.Tokens.Rix.k_width, widths, "constant")
             
             if len(scalpST):
-                primvar.SetFloatArrayDetail("scalpST", scalpST, 2, "uniform")
+                scenegraph_utils.set_primvar_bulk_data(primvar, 'SetFloatArrayDetail', "scalpST", scalpST, 2, "uniform")
 
             if len(mcols):
-                primvar.SetColorDetail("Cs", mcols, "uniform")
+                scenegraph_utils.set_primvar_bulk_data(primvar, 'SetColorDetail', "Cs", mcols, "uniform")
                     
             if rman_sg_hair.motion_steps:
                 super().set_primvar_times(rman_sg_hair.motion_steps, primvar)
@@ -121,10 +125,7 @@ class RmanHairTranslator(RmanTranslator):
         else:
             steps = (2 ** psys.settings.render_step)+1
         
-        if conwidth:
-            hair_width = base_width
-        else:
-            hair_width = []
+        hair_width = base_width
 
         num_parents = len(psys.particles)
         num_children = len(psys.child_particles)
@@ -149,85 +150,90 @@ class RmanHairTranslator(RmanTranslator):
                     mcol_set = i
                     break            
 
-        curve_sets = []
-        points = []
-        vertsArray = []
-        scalpST = []
-        mcols = []
-        nverts = 0
-
         ob_inv_mtx = ob.matrix_world.inverted_safe()
         start_idx = 0
         if psys.settings.child_type != 'NONE' and num_children > 0:
             start_idx = num_parents
-        
-        for pindex in range(start_idx, total_hair_count):
-            strand_points = []
-            # walk through each strand
-            for step in range(0, steps):           
-                pt = psys.co_hair(ob, particle_no=pindex, step=step)
-
-                if pt.length_squared == 0:
-                    # this strand ends prematurely                    
-                    break                
-
-                # put points in object space
-                pt = ob_inv_mtx @ pt
-
-                strand_points.append(pt)
-
-            if len(strand_points) > 1:
-                # double the first and last
-                strand_points = strand_points[:1] + \
-                    strand_points + strand_points[-1:]
-                vertsInStrand = len(strand_points)
-
-                # catmull-rom requires at least 4 vertices
-                if vertsInStrand < 4:
-                    continue
-
-                # for varying width make the width array
-                if not conwidth:
-                    decr = (base_width - tip_width) / (vertsInStrand - 2)
-                    hair_width.extend([base_width] + [(base_width - decr * i)
-                                                    for i in range(vertsInStrand - 2)] +
-                                    [tip_width])
-
-                # add the last point again
-                points.extend(strand_points)
-                vertsArray.append(vertsInStrand)
-                nverts += vertsInStrand
-
-                # get the scalp ST
+
+        strand_indices = np.arange(start_idx, total_hair_count)
+        if len(strand_indices) < 1:
+            return []
+
+        # sample every strand point in one pass, then do the rest with arrays
+        co_hair = psys.co_hair
+        coords = [co_hair(ob, particle_no=pindex, step=step)[:] for pindex in strand_indices.tolist() for step in range(steps)]
+        coords = np.array(coords, dtype=np.float32).reshape(len(strand_indices), steps, 3)
+
+        # a strand ends prematurely at its first zero point
+        nonzero = np.any(coords != 0.0, axis=2)
+        lengths = np.where(nonzero.all(axis=1), steps, np.argmin(nonzero, axis=1))
+
+        # we double the first and last points, and
+        # catmull-rom requires at least 4 vertices
+        keep = lengths > 1
+        strand_indices = strand_indices[keep]
+        lengths = lengths[keep]
+        if len(strand_indices) < 1:
+            return []
+        coords = coords[keep][np.arange(steps) < lengths[:, None]]
+
+        # put points in object space
+        mtx = np.array(ob_inv_mtx, dtype=np.float32)
+        coords = coords @ mtx[:3, :3].T + mtx[:3, 3]
+
+        # for each output vertex, the index of the strand point it comes from
+        verts_array = (lengths + 2).astype(np.int32)
+        vert_starts = np.cumsum(verts_array) - verts_array
+        strand_starts = np.cumsum(lengths) - lengths
+        local_idx = np.arange(verts_array.sum()) - np.repeat(vert_starts, verts_array)
+        point_idx = np.repeat(strand_starts, verts_array) + np.clip(local_idx - 1, 0, np.repeat(lengths - 1, verts_array))
+        points = coords[point_idx]
+
+        # for varying width make the width array
+        if not conwidth:
+            nv = np.repeat(verts_array, verts_array)
+            decr = (base_width - tip_width) / (nv - 2)
+            hair_width = (base_width - decr * (local_idx - 1)).astype(np.float32)
+            hair_width[local_idx == 0] = base_width
+            hair_width[local_idx == nv - 1] = tip_width
+
+        # get the scalp ST and colors
+        scalpST = []
+        mcols = []
+        if export_st or export_mcol:
+            particles = psys.particles
+            st_list = []
+            mcol_list = []
+            for pindex in strand_indices.tolist():
+                particle = particles[(pindex - num_parents) % num_parents]
                 if export_st:
-                    particle = psys.particles[
-                        (pindex - num_parents) % num_parents]                        
                     st = psys.uv_on_emitter(psys_modifier, particle=particle, particle_no=pindex, uv_no=uv_set)
-                    scalpST.append([st[0], st[1]])
-
+                    st_list.append(st[:2])
                 if export_mcol:
-                    particle = psys.particles[
-                        (pindex - num_parents) % num_parents]                  
                     mcol = psys.mcol_on_emitter(psys_modifier, particle=particle, particle_no=pindex, vcol_no=mcol_set)
-                    mcols.append([mcol[0], mcol[1], mcol[2]])
-
-            # if we get more than 100000 vertices, export ri.Curve and reset.  This
-            # is to avoid a maxint on the array length
-            if nverts > 100000:
-                curve_sets.append(
-                    (vertsArray, points, hair_width, scalpST, mcols))
-
-                nverts = 0
-                points = []
-                vertsArray = []
-                if not conwidth:
-                    hair_width = []
-                scalpST = []
-                mcols = []
-
-        if nverts > 0:
-            curve_sets.append((vertsArray, points,
-                            hair_width, scalpST, mcols))
-
-        return curve_sets              
-            
\ No newline at end of file
+                    mcol_list.append(mcol[:3])
+            if export_st:
+                scalpST = np.array(st_list, dtype=np.float32)
+            if export_mcol:
+                mcols = np.array(mcol_list, dtype=np.float32)
+
+        # if we get more than 100000 vertices, start a new curve set. This
+        # is to avoid a maxint on the array length
+        curve_sets = []
+        verts_end = np.cumsum(verts_array)
+        start = 0
+        while start < len(verts_array):
+            vert_base = verts_end[start] - verts_array[start]
+            end = min(int(np.searchsorted(verts_end, vert_base + 100000, side='right')) + 1, len(verts_array))
+            vert_end = verts_end[end - 1]
+            widths = hair_width
+            if not conwidth:
+                widths = hair_width[vert_base:vert_end]
+            curve_sets.append((verts_array[start:end], 
+                               points[vert_base:vert_end], 
+                               widths,
+                               scalpST[start:end] if len(scalpST) else [],
+                               mcols[start:end] if len(mcols) else []))
+            start = end
+
+        return curve_sets
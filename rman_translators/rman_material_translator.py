@@ -13,6 +13,29 @@ import math
 import re
 import bpy
 
+__TERMINAL_SETTERS__ = {
+    'bxdf': 'SetBxdf',
+    'light': 'SetLight',
+    'displace': 'SetDisplace'
+}
+
+def get_node_key(mat, node):
+    if node is None:
+        return None
+    # nodes in the material's own node tree are keyed with None, as the
+    # name of the embedded node tree isn't unique
+    nt = node.id_data
+    if nt == mat.node_tree:
+        return (None, node.name)
+    return (nt.name, node.name)
+
+def find_node_by_key(mat, key):
+    nt_name, node_name = key
+    nt = mat.node_tree if nt_name is None else bpy.data.node_groups.get(nt_name, None)
+    if nt is None:
+        return None
+    return nt.nodes.get(node_name, None)
+
 def get_root_node(node, type='bxdf'):
     rman_type = getattr(node, 'renderman_node_type', node.bl_idname)
     if rman_type == type:
@@ -45,6 +68,17 @@ class RmanMaterialTranslator(RmanTranslator):
         rm = mat.renderman
         succeed = False
 
+        signature = None
+        if mat.node_tree:
+            signature = shadergraph_utils.get_nodetree_signature(mat.node_tree)
+            # if only parameter values changed, we can update the existing
+            # shading nodes in place, rather than rebuilding the whole network
+            if signature == rman_sg_material.nodetree_signature and not rman_sg_material.is_frame_sensitive:
+                if self.update_shader_params(mat, rman_sg_material):
+                    return
+        rman_sg_material.nodetree_signature = None
+        rman_sg_material.shader_terminals = dict()
+
         rman_sg_material.has_meshlight = False
         rman_sg_material.sg_node.SetBxdf(None)        
         rman_sg_material.sg_node.SetLight(None)
@@ -58,10 +92,90 @@ class RmanMaterialTranslator(RmanTranslator):
 
         if mat.node_tree:
             succeed = self.export_shader_nodetree(mat, rman_sg_material, handle=handle)
+            if succeed and rman_sg_material.shader_terminals is not None:
+                rman_sg_material.nodetree_signature = signature
 
         if not succeed:
             succeed = self.export_simple_shader(mat, rman_sg_material, mat_handle=handle)     
 
+    def record_shader_terminal(self, mat, rman_sg_material, terminal, sg_nodes):
+        '''Remember the shading nodes of one of the terminals of the material,
+        along with the values of their parameters, so that update_shader_params
+        can update them in place.
+        '''
+        if rman_sg_material.shader_terminals is None:
+            return
+        params = []
+        for node, bl_node_info in rman_sg_material.nodes_to_blnodeinfo.items():
+            if bl_node_info.is_cycles_node:
+                # the parameters of cycles nodes are set when they are translated,
+                # so we can't update them in place
+                rman_sg_material.shader_terminals = None
+                return
+            param_values = None
+            if not bl_node_info.group_node:
+                # parameters inside of a node group can take their values from the
+                # group node's inputs, so we always export those
+                param_values = property_utils.get_node_param_values(node)
+            params.append((get_node_key(mat, node), get_node_key(mat, bl_node_info.group_node), 
+                            bl_node_info.sg_node, param_values))
+        rman_sg_material.shader_terminals[terminal] = (sg_nodes, params)
+
+    def update_shader_params(self, mat, rman_sg_material):
+        '''Update the parameters of the shading nodes of the material in place,
+        re-exporting only the nodes whose parameters changed. This is only valid if
+        the topology of the node tree hasn't changed since the last full export.
+
+        Returns:
+            (bool) - False if the material needs a full export
+        '''
+        if rman_sg_material.shader_terminals is None:
+            return False
+
+        updates = []
+        for terminal, (sg_nodes, params) in rman_sg_material.shader_terminals.items():
+            nodes_to_blnodeinfo = dict()
+            changed_nodes = []
+            for i, (node_key, group_node_key, sg_node, param_values) in enumerate(params):
+                node = find_node_by_key(mat, node_key)
+                group_node = find_node_by_key(mat, group_node_key) if group_node_key else None
+                if node is None or (group_node_key and group_node is None):
+                    return False
+                nodes_to_blnodeinfo[node] = shadergraph_utils.BlNodeInfo(sg_node, group_node=group_node)
+                if param_values is not None:
+                    new_values = property_utils.get_node_param_values(node)
+                    if new_values == param_values:
+                        continue
+                    params[i] = (node_key, group_node_key, sg_node, new_values)
+                changed_nodes.append(node)
+            if changed_nodes:
+                # nodes consuming a changed node through a vstruct need
+                # to be exported too
+                dependents = shadergraph_utils.get_vstruct_dependents(changed_nodes)
+                if dependents is None:
+                    return False
+                for node in dependents:
+                    if node in nodes_to_blnodeinfo and node not in changed_nodes:
+                        changed_nodes.append(node)
+            updates.append((terminal, sg_nodes, nodes_to_blnodeinfo, changed_nodes))
+
+        for terminal, sg_nodes, nodes_to_blnodeinfo, changed_nodes in updates:
+            if not changed_nodes:
+                continue
+            rfb_log().debug("Updating %d shading nodes of %s (%s)" % (len(changed_nodes), mat.name, terminal))
+            rman_sg_material.nodes_to_blnodeinfo = nodes_to_blnodeinfo
+            for node in changed_nodes:
+                bl_node_info = nodes_to_blnodeinfo[node]
+                property_utils.property_group_to_rixparams(node, rman_sg_material, bl_node_info.sg_node, ob=mat, group_node=bl_node_info.group_node)
+            set_terminal = getattr(rman_sg_material.sg_node, __TERMINAL_SETTERS__[terminal])
+            set_terminal(sg_nodes)
+
+        if 'light' in rman_sg_material.shader_terminals:
+            # light filters are not part of the node tree, so always export them
+            self.update_light_filters(mat, rman_sg_material)
+
+        return True
+
     def export_shader_grease_pencil(self, mat, rman_sg_material, handle):
         gp_mat = mat.grease_pencil
         rman_sg_material.is_gp_material = True
@@ -112,6 +226,8 @@ class RmanMaterialTranslator(RmanTranslator):
                     if solo_node:
                         success = self.export_solo_shader(material, out, solo_node, rman_sg_material, handle)
                         if success:
+                            # solo shaders are always fully exported
+                            rman_sg_material.shader_terminals = None
                             return True
 
                 # bxdf
@@ -133,6 +249,7 @@ class RmanMaterialTranslator(RmanTranslator):
                         
                         if bxdfList:
                             rman_sg_material.sg_node.SetBxdf(bxdfList)   
+                            self.record_shader_terminal(material, rman_sg_material, 'bxdf', bxdfList)
                     else:
                         self.create_pxrdiffuse_node(rman_sg_material, handle)         
                 else:
@@ -156,6 +273,7 @@ class RmanMaterialTranslator(RmanTranslator):
                                                      
                         if lightNodesList:
                             rman_sg_material.sg_node.SetLight(lightNodesList)                                   
+                            self.record_shader_terminal(material, rman_sg_material, 'light', lightNodesList)
 
                 # displacement
                 socket = out.inputs['Displacement']
@@ -175,6 +293,7 @@ class RmanMaterialTranslator(RmanTranslator):
                                                                               
                         if dispList:
                             rman_sg_material.sg_node.SetDisplace(dispList)  
+                            self.record_shader_terminal(material, rman_sg_material, 'displace', dispList)
 
                 return True                        
                     
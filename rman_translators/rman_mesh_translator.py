@@ -10,25 +10,22 @@ import bpy
 import math
 import numpy as np
 
-def _get_mats_faces_(nverts, material_ids):
-
-    mats = {}
-    for face_id, num_verts in enumerate(nverts):
-        mat_id = material_ids[face_id]
-        if mat_id not in mats:
-            mats[mat_id] = []
-        mats[mat_id].append(face_id)
-    return mats
-
-def _is_multi_material_(ob, mesh):
+def _get_mats_faces_(material_ids):
+    # Partition the face indices by material index, in a single sort.
+    # Returns a dictionary of material index -> array of face indices,
+    # with the face indices in ascending order.
+    order = np.argsort(material_ids, kind='stable').astype(np.int32)
+    mat_ids, starts = np.unique(material_ids[order], return_index=True)
+    faces = np.split(order, starts[1:])
+    return dict(zip(mat_ids.tolist(), faces))
+
+def _is_multi_material_(ob, mesh, material_ids=None):
     if len(ob.data.materials) < 2 or len(mesh.polygons) == 0:
         return False
 
-    first_mat = mesh.polygons[0].material_index
-    for p in mesh.polygons:
-        if p.material_index != first_mat:
-            return True
-    return False
+    if material_ids is None:
+        material_ids = _get_material_ids(ob, mesh)
+    return bool((material_ids != material_ids[0]).any())
 
 # requires facevertex interpolation
 def _get_mesh_uv_(mesh, name=""):
@@ -45,10 +42,9 @@ def _get_mesh_uv_(mesh, name=""):
         return None
 
     uv_count = len(uv_loop_layer.data)
-    fastuvs = np.zeros(uv_count * 2)
+    fastuvs = np.zeros(uv_count * 2, dtype=np.float32)
     uv_loop_layer.data.foreach_get("uv", fastuvs)
-    fastuvs = fastuvs.reshape(uv_count, 2)    
-    uvs = fastuvs.tolist()
+    uvs = fastuvs.reshape(uv_count, 2)
 
     return uvs
 
@@ -60,12 +56,12 @@ def _get_mesh_vcol_(mesh, name=""):
         return None
 
     vcol_count = len(vcol_layer.data)
-    fastvcols = np.zeros(vcol_count * 4)
+    fastvcols = np.zeros(vcol_count * 4, dtype=np.float32)
     vcol_layer.data.foreach_get("color", fastvcols)
     fastvcols = np.reshape(fastvcols, (vcol_count, 4))
-    pre_cols = fastvcols.tolist()     
-    
-    cols = [ [c[0], c[1], c[2]] for c in pre_cols ]
+
+    # drop the alpha channel
+    cols = np.ascontiguousarray(fastvcols[:, :3])
 
     return cols    
 
@@ -80,37 +76,158 @@ def _get_mesh_vattr_(mesh, name=""):
         return None
 
     vcol_count = len(vattr_layer.data)
-    fastvattrs = np.zeros(vcol_count * 4)
+    fastvattrs = np.zeros(vcol_count * 4, dtype=np.float32)
     vattr_layer.data.foreach_get("color", fastvattrs)
     fastvattrs = np.reshape(fastvattrs, (vcol_count, 4))
-    pre_cols = fastvattrs.tolist()     
-    
-    attrs = [ [a[0], a[1], a[2]] for a in pre_cols ]
+
+    # drop the alpha channel
+    attrs = np.ascontiguousarray(fastvattrs[:, :3])
 
     return attrs 
 
-def _get_mesh_vgroup_(ob, mesh, name=""):
-    vgroup = ob.vertex_groups[name] if name != "" else ob.vertex_groups.active
-    weights = []
+def _get_mesh_vgroups_(ob, mesh, names):
+    # Fill a dense array of weights for all of the requested vertex groups,
+    # with a single pass over the vertices. Vertices that are not part of
+    # a group get a weight of 0.0. Returns a dictionary of name -> weights.
+    nvertices = len(mesh.vertices)
+    weights = np.zeros((len(names), nvertices), dtype=np.float32)
+    vgroups = dict()
+    rows = dict()
+    attributes = getattr(mesh, 'attributes', dict())
+
+    for i, name in enumerate(names):
+        # geometry nodes can output weights as a regular point attribute,
+        # in which case we can read them directly
+        attr = attributes.get(name, None) if name != "" else None
+        if attr and attr.domain == 'POINT' and attr.data_type == 'FLOAT':
+            attr.data.foreach_get('value', weights[i])
+            vgroups[name] = weights[i]
+            continue
 
-    if vgroup is None:
-        return None
+        vgroup = ob.vertex_groups.get(name, None) if name != "" else ob.vertex_groups.active
+        if vgroup is None:
+            continue
+        rows.setdefault(vgroup.index, []).append(i)
+        vgroups[name] = weights[i]
 
-    for v in mesh.vertices:
-        if len(v.groups) == 0:
-            weights.append(0.0)
-        else:
-            weights.extend([g.weight for g in v.groups
-                            if g.group == vgroup.index])
+    if rows:
+        indices = dict([(group, []) for group in rows.keys()])
+        values = dict([(group, []) for group in rows.keys()])
+        for v in mesh.vertices:
+            for g in v.groups:
+                if g.group in indices:
+                    indices[g.group].append(v.index)
+                    values[g.group].append(g.weight)
+
+        for group, group_rows in rows.items():
+            for i in group_rows:
+                weights[i, indices[group]] = values[group]
 
-    return weights
+    return vgroups
+
+def _get_mesh_vgroup_(ob, mesh, name=""):
+    return _get_mesh_vgroups_(ob, mesh, [name]).get(name, None)
+
+def _get_edge_creases_(mesh):
+    creases = np.zeros(len(mesh.edges), dtype=np.float32)
+    mesh.edges.foreach_get('crease', creases)
+    return creases
+
+def _get_vertex_creases_(mesh):
+    # vertex creases are only available in newer versions of Blender
+    vertex_creases = getattr(mesh, 'vertex_creases', None)
+    if not vertex_creases:
+        return None
+    creases = np.zeros(len(mesh.vertices), dtype=np.float32)
+    vertex_creases[0].data.foreach_get('value', creases)
+    return creases
+
+def _crease_to_sharpness_(creases):
+    # squared, to match blender appareance better
+    #: range 0 - 10 (infinitely sharp)
+    return creases * creases * 10.0
+
+def _chain_edges_(edges):
+    # Link edges into chains of vertices. A chain only continues
+    # through vertices that are shared by exactly two of the edges.
+    edge_list = edges.tolist()
+    adjacency = dict()
+    for i, (v0, v1) in enumerate(edge_list):
+        adjacency.setdefault(v0, []).append(i)
+        adjacency.setdefault(v1, []).append(i)
+
+    used = [False] * len(edge_list)
+    chains = []
+    # start from the chain end points first, then pick up any closed loops
+    starts = [v for v, e in adjacency.items() if len(e) != 2] + list(adjacency.keys())
+    for start in starts:
+        for e in adjacency[start]:
+            if used[e]:
+                continue
+            chain = [start]
+            v = start
+            while True:
+                used[e] = True
+                v0, v1 = edge_list[e]
+                v = v1 if v0 == v else v0
+                chain.append(v)
+                next_edges = adjacency[v]
+                if len(next_edges) != 2:
+                    break
+                e = next_edges[1] if next_edges[0] == e else next_edges[0]
+                if used[e]:
+                    break
+            chains.append(chain)
+    return chains
+
+def _get_crease_chains_(mesh):
+    # Returns a list of (sharpness, chain of vertex indices) for all creased edges,
+    # with edges of equal sharpness joined into as few chains as possible
+    creases = _get_edge_creases_(mesh)
+    creased = np.flatnonzero(creases > 0.0)
+    if len(creased) == 0:
+        return []
+
+    edges = np.zeros(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get('vertices', edges)
+    edges = edges.reshape(-1, 2)[creased]
+    sharpness = _crease_to_sharpness_(creases[creased])
+
+    order = np.argsort(sharpness, kind='stable')
+    values, starts = np.unique(sharpness[order], return_index=True)
+    crease_chains = []
+    for value, group in zip(values.tolist(), np.split(order, starts[1:])):
+        for chain in _chain_edges_(edges[group]):
+            crease_chains.append((value, chain))
+    return crease_chains
+
+def _get_corners_(mesh):
+    # Returns the creased vertex indices, and their sharpness
+    creases = _get_vertex_creases_(mesh)
+    if creases is None:
+        return (np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32))
+    corners = np.flatnonzero(creases > 0.0)
+    return (corners, _crease_to_sharpness_(creases[corners]))
 
 def _get_material_ids(ob, geo):        
-    fast_material_ids = np.zeros(len(geo.polygons), dtype=np.int)
-    geo.polygons.foreach_get("material_index", fast_material_ids)
-    material_ids = fast_material_ids.tolist()
+    material_ids = np.zeros(len(geo.polygons), dtype=np.int32)
+    geo.polygons.foreach_get("material_index", material_ids)
     return material_ids
 
+def _get_reference_pose_data_(rm):
+    # Flatten the reference pose into an array, so re-freezing it
+    # changes the mesh fingerprint
+    if len(rm.reference_pose) < 1:
+        return None
+    data = np.empty((len(rm.reference_pose), 16), dtype=np.float32)
+    for i, rp in enumerate(rm.reference_pose):
+        data[i, 0:4] = (rp.has_Pref, rp.has_WPref, rp.has_Nref, rp.has_WNref)
+        data[i, 4:7] = rp.rman__Pref
+        data[i, 7:10] = rp.rman__WPref
+        data[i, 10:13] = rp.rman__Nref
+        data[i, 13:16] = rp.rman__WNref
+    return data
+
 def _export_reference_pose(ob, rm, rixparams, vertex_detail):
     rman__Pref = []
     rman__WPref = []
@@ -171,24 +288,55 @@ def export_tangents(ob, geo, rixparams, uvmap="", name=""):
         loops = len(geo.loops)
         fasttangent = np.zeros(loops*3, dtype=np.float32)
         geo.loops.foreach_get('tangent', fasttangent)
-        fasttangent = np.reshape(fasttangent, (loops, 3))
-        tangents = fasttangent.tolist()    
+        tangents = np.reshape(fasttangent, (loops, 3))
 
         fastbitangent = np.zeros(loops*3, dtype=np.float32)
         geo.loops.foreach_get('bitangent', fastbitangent)
-        bitangent = fastbitangent.tolist()      
+        bitangent = np.reshape(fastbitangent, (loops, 3))
         geo.free_tangents()    
 
         if name == "":
-            rixparams.SetVectorDetail('Tn', tangents, 'facevarying')
-            rixparams.SetVectorDetail('Bn', bitangent, 'facevarying')    
+            scenegraph_utils.set_primvar_bulk_data(rixparams, 'SetVectorDetail', 'Tn', tangents, 'facevarying')
+            scenegraph_utils.set_primvar_bulk_data(rixparams, 'SetVectorDetail', 'Bn', bitangent, 'facevarying')    
         else:
-            rixparams.SetVectorDetail('%s_Tn' % name, tangents, 'facevarying')
-            rixparams.SetVectorDetail('%s_Bn' % name, bitangent, 'facevarying')                
+            scenegraph_utils.set_primvar_bulk_data(rixparams, 'SetVectorDetail', '%s_Tn' % name, tangents, 'facevarying')
+            scenegraph_utils.set_primvar_bulk_data(rixparams, 'SetVectorDetail', '%s_Bn' % name, bitangent, 'facevarying')                
     except RuntimeError as err:
         rfb_log().debug("Can't export tangent vectors: %s" % str(err))       
 
-def _get_primvars_(ob, rman_sg_mesh, geo, rixparams):
+def _get_primvar_arrays_(ob, geo):
+    # Fetch the arrays for all of the mesh attributes we export as primvars.
+    # Each entry is (data_source, primvar name, data, tangents), where tangents
+    # is a (uvmap, name) tuple if tangent vectors should also be exported.
+    rm = ob.original.data.renderman
+    primvar_arrays = []
+
+    if rm.export_default_uv:
+        primvar_arrays.append(('UV_TEXTURE', 'st', _get_mesh_uv_(geo), ('', '')))
+
+    if rm.export_default_vcol:
+        primvar_arrays.append(('VERTEX_COLOR', 'Cs', _get_mesh_vcol_(geo), None))
+
+    # fetch all vertex groups at once
+    vgroup_names = [p.data_name for p in rm.prim_vars if p.data_source == 'VERTEX_GROUP']
+    vgroups = dict()
+    if vgroup_names:
+        vgroups = _get_mesh_vgroups_(ob, geo, vgroup_names)
+
+    for p in rm.prim_vars:
+        if p.data_source == 'VERTEX_COLOR':
+            primvar_arrays.append(('VERTEX_COLOR', p.name, _get_mesh_vcol_(geo, p.data_name), None))
+        elif p.data_source == 'UV_TEXTURE':
+            tangents = (p.data_name, p.name) if p.export_tangents else None
+            primvar_arrays.append(('UV_TEXTURE', p.name, _get_mesh_uv_(geo, p.data_name), tangents))
+        elif p.data_source == 'VERTEX_GROUP':
+            primvar_arrays.append(('VERTEX_GROUP', p.name, vgroups.get(p.data_name, None), None))
+        elif p.data_source == 'VERTEX_ATTR_COLOR':
+            primvar_arrays.append(('VERTEX_ATTR_COLOR', p.data_name, _get_mesh_vattr_(geo, p.data_name), None))
+
+    return primvar_arrays
+
+def _get_primvars_(ob, rman_sg_mesh, geo, rixparams, primvar_arrays=None):
     #rm = ob.data.renderman
     # Stange problem here : ob seems to not be in sync with the scene
     # when a geometry node is active...
@@ -197,50 +345,25 @@ def _get_primvars_(ob, rman_sg_mesh, geo, rixparams):
     vertex_detail = rman_sg_mesh.npoints 
     facevarying_detail = rman_sg_mesh.nverts 
 
-    if rm.export_default_uv:
-        uvs = _get_mesh_uv_(geo)
-        if uvs and len(uvs) > 0:
-            detail = "facevarying" if facevarying_detail == len(uvs) else "vertex"
-            rixparams.SetFloatArrayDetail("st", uvs, 2, detail)
-            export_tangents(ob, geo, rixparams)    
+    if primvar_arrays is None:
+        primvar_arrays = _get_primvar_arrays_(ob, geo)
 
-    if rm.export_default_vcol:
-        vcols = _get_mesh_vcol_(geo)
-        if vcols and len(vcols) > 0:
-            detail = "facevarying" if facevarying_detail == len(vcols) else "vertex"
-            rixparams.SetColorDetail("Cs", vcols, detail)
+    for data_source, name, data, tangents in primvar_arrays:
+        if data is None or len(data) < 1:
+            continue
+        detail = "facevarying" if facevarying_detail == len(data) else "vertex"
+        if data_source == 'UV_TEXTURE':
+            scenegraph_utils.set_primvar_bulk_data(rixparams, 'SetFloatArrayDetail', name, data, 2, detail)
+            if tangents:
+                export_tangents(ob, geo, rixparams, uvmap=tangents[0], name=tangents[1])
+        elif data_source == 'VERTEX_GROUP':
+            scenegraph_utils.set_primvar_bulk_data(rixparams, 'SetFloatDetail', name, data, detail)
+        else:
+            scenegraph_utils.set_primvar_bulk_data(rixparams, 'SetColorDetail', name, data, detail)
 
     # reference pose
     if hasattr(rm, 'reference_pose'):
         _export_reference_pose(ob, rm, rixparams, vertex_detail)
-    
-    # custom prim vars
-    for p in rm.prim_vars:
-        if p.data_source == 'VERTEX_COLOR':
-            vcols = _get_mesh_vcol_(geo, p.data_name)
-            
-            if vcols and len(vcols) > 0:
-                detail = "facevarying" if facevarying_detail == len(vcols) else "vertex"
-                rixparams.SetColorDetail(p.name, vcols, detail)
-            
-        elif p.data_source == 'UV_TEXTURE':
-            uvs = _get_mesh_uv_(geo, p.data_name)
-            if uvs and len(uvs) > 0:
-                detail = "facevarying" if facevarying_detail == len(uvs) else "vertex"
-                rixparams.SetFloatArrayDetail(p.name, uvs, 2, detail)
-                if p.export_tangents:
-                    export_tangents(ob, geo, rixparams, uvmap=p.data_name, name=p.name) 
-
-        elif p.data_source == 'VERTEX_GROUP':
-            weights = _get_mesh_vgroup_(ob, geo, p.data_name)
-            if weights and len(weights) > 0:
-                detail = "facevarying" if facevarying_detail == len(weights) else "vertex"
-                rixparams.SetFloatDetail(p.name, weights, detail)
-        elif p.data_source == 'VERTEX_ATTR_COLOR':
-            vattr = _get_mesh_vattr_(geo, p.data_name)            
-            if vattr and len(vattr) > 0:
-                detail = "facevarying" if facevarying_detail == len(vattr) else "vertex"
-                rixparams.SetColorDetail(p.data_name, vattr, detail)
 
     rm_scene = rman_sg_mesh.rman_scene.bl_scene.renderman
     for prop_name, meta in rm.prop_meta.items():
@@ -272,17 +395,6 @@ class RmanMeshTranslator(RmanTranslator):
         self.bl_type = 'MESH' 
 
     def _get_subd_tags_(self, ob, mesh, primvar):
-        creases = []
-
-        # only do creases 1 edge at a time for now,
-        # detecting chains might be tricky..
-        for e in mesh.edges:
-            if e.crease > 0.0:
-                creases.append((e.vertices[0], e.vertices[1],
-                                e.crease * e.crease * 10))
-                # squared, to match blender appareance better
-                #: range 0 - 10 (infinitely sharp)
-
         tags = ['interpolateboundary', 'facevaryinginterpolateboundary']
         nargs = [1, 0, 0, 1, 0, 0]
         intargs = [ int(ob.data.renderman.rman_subdivInterp),
@@ -290,12 +402,20 @@ class RmanMeshTranslator(RmanTranslator):
         floatargs = []
         stringargs = []   
 
-        if len(creases) > 0:
-            for c in creases:
-                tags.append('crease')
-                nargs.extend([2, 1, 0])
-                intargs.extend([c[0], c[1]])
-                floatargs.append(c[2])           
+        # creases, one tag per chain of edges with the same sharpness
+        for sharpness, chain in _get_crease_chains_(mesh):
+            tags.append('crease')
+            nargs.extend([len(chain), 1, 0])
+            intargs.extend(chain)
+            floatargs.append(sharpness)
+
+        # corners, all in one tag with a sharpness per vertex
+        corner_verts, corner_sharpness = _get_corners_(mesh)
+        if len(corner_verts) > 0:
+            tags.append('corner')
+            nargs.extend([len(corner_verts), len(corner_verts), 0])
+            intargs.extend(corner_verts.tolist())
+            floatargs.extend(corner_sharpness.tolist())
 
         primvar.SetStringArray(self.rman_scene.rman.Tokens.Rix.k_Ri_subdivtags, tags, len(tags))
         primvar.SetIntegerArray(self.rman_scene.rman.Tokens.Rix.k_Ri_subdivtagnargs, nargs, len(nargs))
@@ -303,6 +423,45 @@ class RmanMeshTranslator(RmanTranslator):
         primvar.SetFloatArray(self.rman_scene.rman.Tokens.Rix.k_Ri_subdivtagfloatargs, floatargs, len(floatargs))
         primvar.SetStringArray(self.rman_scene.rman.Tokens.Rix.k_Ri_subdivtagstringtags, stringargs, len(stringargs))        
 
+    def _get_mesh_fingerprint_(self, ob, mesh, rman_sg_mesh, nverts, verts, P, N, primvar_arrays, material_ids=None):
+        rm = ob.original.data.renderman
+
+        rm_scene = self.rman_scene.bl_scene.renderman
+
+        settings = [rman_sg_mesh.is_subdiv, rman_sg_mesh.is_deforming, rman_sg_mesh.deform_motion_steps]
+        for prop_name, meta in rm.prop_meta.items():
+            val = getattr(rm, prop_name, None)
+            if hasattr(val, '__getitem__') and not isinstance(val, str):
+                val = tuple(val)
+            settings.append(val)
+            # inheritable primvars can take their value from the scene
+            if 'primvar' in meta and 'inheritable' in meta and hasattr(rm_scene, prop_name):
+                val = getattr(rm_scene, prop_name)
+                if hasattr(val, '__getitem__') and not isinstance(val, str):
+                    val = tuple(val)
+                settings.append(val)
+        settings.append([m.name if m else '' for m in ob.data.materials])
+
+        data = [nverts, verts, P, N]
+        reference_pose = _get_reference_pose_data_(rm)
+        if reference_pose is not None:
+            data.append(reference_pose)
+        for data_source, name, d, tangents in primvar_arrays:
+            settings.append((data_source, name, tangents))
+            if d is not None:
+                data.append(np.asarray(d))
+
+        if material_ids is not None:
+            data.append(material_ids)
+
+        if rman_sg_mesh.is_subdiv:
+            data.append(_get_edge_creases_(mesh))
+            vertex_creases = _get_vertex_creases_(mesh)
+            if vertex_creases is not None:
+                data.append(vertex_creases)
+
+        return self.get_fingerprint(settings, *data)
+
     def export(self, ob, db_name):
         
         sg_node = self.rman_scene.sg_scene.CreateMesh(db_name)
@@ -336,14 +495,14 @@ class RmanMeshTranslator(RmanTranslator):
                     c.SetPrimVars(pvar)            
             return       
 
-        primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex", time_sample)                            
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex", time_sample)                            
 
         sg_node.SetPrimVars(primvar)
 
         if rman_sg_mesh.is_multi_material:
             for c in rman_sg_mesh.multi_material_children:
                 pvar = c.GetPrimVars()
-                pvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex", time_sample)                                  
+                scenegraph_utils.set_primvar_bulk_data(pvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex", time_sample)                                  
                 c.SetPrimVars(pvar)
 
         ob.to_mesh_clear()    
@@ -365,7 +524,7 @@ class RmanMeshTranslator(RmanTranslator):
         (nverts, verts, P, N) = object_utils._get_mesh_(mesh, get_normals=get_normals)
         
         # if this is empty continue:
-        if nverts == []:
+        if len(nverts) == 0:
             if not input_mesh:
                 ob.to_mesh_clear()
             rman_sg_mesh.npoints = 0
@@ -373,8 +532,25 @@ class RmanMeshTranslator(RmanTranslator):
             rman_sg_mesh.nverts = 0
             rman_sg_mesh.is_transforming = False
             rman_sg_mesh.is_deforming = False
+            rman_sg_mesh.fingerprint = None
             return None
 
+        primvar_arrays = _get_primvar_arrays_(ob, mesh)
+
+        material_ids = None
+        if len(ob.data.materials) > 1:
+            material_ids = _get_material_ids(ob, mesh)
+
+        if self.rman_scene.is_interactive:
+            # During IPR, skip re-translating if nothing that goes into
+            # the mesh has changed (ex: only a material was edited)
+            fingerprint = self._get_mesh_fingerprint_(ob, mesh, rman_sg_mesh, nverts, verts, P, N, primvar_arrays, material_ids=material_ids)
+            if self.is_unchanged(rman_sg_mesh, fingerprint):
+                rfb_log().debug("Mesh unchanged, skipping translation: %s" % ob.name)
+                if not input_mesh:
+                    ob.to_mesh_clear()
+                return True
+
         npolys = len(nverts) 
         npoints = len(P)
         numnverts = len(verts)
@@ -384,22 +560,33 @@ class RmanMeshTranslator(RmanTranslator):
         rman_sg_mesh.nverts = numnverts
 
         sg_node.Define( npolys, npoints, numnverts )
-        rman_sg_mesh.is_multi_material = _is_multi_material_(ob, mesh)
+        rman_sg_mesh.is_multi_material = _is_multi_material_(ob, mesh, material_ids=material_ids)
             
         primvar = sg_node.GetPrimVars()
         primvar.Clear()
 
+        velocity = None
+        if rman_sg_mesh.is_deforming and rman_sg_mesh.use_velocity_blur:
+            velocity = object_utils._get_mesh_velocity_(ob, mesh)
+            if velocity is None or len(velocity) != npoints:
+                rfb_log().warning("Could not find velocity attribute '%s' for: %s. Deformation blur disabled." % (rm.deform_velocity_attr, ob.name))
+                rman_sg_mesh.is_deforming = False
+                velocity = None
+
         if rman_sg_mesh.is_deforming and len(rman_sg_mesh.deform_motion_steps) > 1:
             super().set_primvar_times(rman_sg_mesh.deform_motion_steps, primvar)
         
-        primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")
-        _get_primvars_(ob, rman_sg_mesh, mesh, primvar)   
+        if velocity is not None:
+            self.set_velocity_deform_samples(rman_sg_mesh, ob, primvar, P, velocity)
+        else:
+            scenegraph_utils.set_primvar_bulk_data(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")
+        _get_primvars_(ob, rman_sg_mesh, mesh, primvar, primvar_arrays=primvar_arrays)   
 
-        primvar.SetIntegerDetail(self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, nverts, "uniform")
-        primvar.SetIntegerDetail(self.rman_scene.rman.Tokens.Rix.k_Ri_vertices, verts, "facevarying")                  
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetIntegerDetail', self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, nverts, "uniform")
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetIntegerDetail', self.rman_scene.rman.Tokens.Rix.k_Ri_vertices, verts, "facevarying")                  
 
         if rman_sg_mesh.is_subdiv:
-            creases = self._get_subd_tags_(ob, mesh, primvar)
+            self._get_subd_tags_(ob, mesh, primvar)
             if ob.data.renderman.rman_subdiv_scheme == 'none':
                 # we were tagged as a subdiv by a modifier
                 sg_node.SetScheme(self.rman_scene.rman.Tokens.Rix.k_catmullclark) 
@@ -408,18 +595,22 @@ class RmanMeshTranslator(RmanTranslator):
 
         else:
             sg_node.SetScheme(None)
-            if N:
+            if len(N) > 0:
                 if len(N) == numnverts:
-                    primvar.SetNormalDetail(self.rman_scene.rman.Tokens.Rix.k_N, N, "facevarying")         
+                    scenegraph_utils.set_primvar_bulk_data(primvar, 'SetNormalDetail', self.rman_scene.rman.Tokens.Rix.k_N, N, "facevarying")         
                 else:
-                    primvar.SetNormalDetail(self.rman_scene.rman.Tokens.Rix.k_N, N, "uniform")         
+                    scenegraph_utils.set_primvar_bulk_data(primvar, 'SetNormalDetail', self.rman_scene.rman.Tokens.Rix.k_N, N, "uniform")         
         subdiv_scheme = getattr(ob.data.renderman, 'rman_subdiv_scheme', 'none')
         rman_sg_mesh.subdiv_scheme = subdiv_scheme
 
+        # remove any sub-meshes from a previous translation
+        for c in rman_sg_mesh.multi_material_children:
+            sg_node.RemoveChild(c)
+            self.rman_scene.sg_scene.DeleteDagNode(c)
+        rman_sg_mesh.multi_material_children = []
+
         if rman_sg_mesh.is_multi_material:
-            material_ids = _get_material_ids(ob, mesh)
-            for mat_id, faces in \
-                _get_mats_faces_(nverts, material_ids).items():
+            for mat_id, faces in _get_mats_faces_(material_ids).items():
 
                 mat = ob.data.materials[mat_id]
                 if not mat:
@@ -427,7 +618,7 @@ class RmanMeshTranslator(RmanTranslator):
                 sg_material = self.rman_scene.rman_materials.get(mat.original, None)
 
                 if mat_id == 0:
-                    primvar.SetIntegerArray(self.rman_scene.rman.Tokens.Rix.k_shade_faceset, faces, len(faces))
+                    scenegraph_utils.set_primvar_bulk_data(primvar, 'SetIntegerArray', self.rman_scene.rman.Tokens.Rix.k_shade_faceset, faces, len(faces))
                     scenegraph_utils.set_material(sg_node, sg_material.sg_node)
                 else:                
                     sg_sub_mesh =  self.rman_scene.sg_scene.CreateMesh("")
@@ -438,15 +629,13 @@ class RmanMeshTranslator(RmanTranslator):
                     if rman_sg_mesh.is_deforming and len(rman_sg_mesh.deform_motion_steps) > 1:
                         super().set_primvar_times(rman_sg_mesh.deform_motion_steps, pvars)
                     pvars.Inherit(primvar)
-                    pvars.SetIntegerArray(self.rman_scene.rman.Tokens.Rix.k_shade_faceset, faces, len(faces))                    
+                    scenegraph_utils.set_primvar_bulk_data(pvars, 'SetIntegerArray', self.rman_scene.rman.Tokens.Rix.k_shade_faceset, faces, len(faces))                    
                     sg_sub_mesh.SetPrimVars(pvars)
                     # call export_object_primvars so we can get things like displacement bound
                     super().export_object_primvars(ob, rman_sg_mesh, sg_sub_mesh)
                     scenegraph_utils.set_material(sg_sub_mesh, sg_material.sg_node)
                     sg_node.AddChild(sg_sub_mesh)
                     rman_sg_mesh.multi_material_children.append(sg_sub_mesh)
-        else:
-            rman_sg_mesh.multi_material_children = []
 
         sg_node.SetPrimVars(primvar)
 
@@ -3,9 +3,13 @@ from ..rman_sg_nodes.rman_sg_nurbs import RmanSgNurbs
 from ..rfb_utils import object_utils
 from ..rfb_utils import string_utils
 from ..rfb_utils import property_utils
+from ..rfb_utils import scenegraph_utils
 
 import bpy
 import math
+import numpy as np
+
+__NURBS_KNOTS_CACHE__ = dict()
 
 '''
 Code reference from: https://blender.stackexchange.com/questions/34145/calculate-points-on-a-nurbs-curve-without-converting-to-mesh
@@ -191,6 +195,35 @@ def nurb_make_curve(nu, resolu, stride):
 
     return coord_array
 
+def get_knots(pnts, order, endpoint, bezier, cyclic=False):
+    '''Get the knot vector for a spline, with the same layout as makeknots.
+    Knot vectors are cached by point count, order and flags, and the returned
+    array is read-only.
+
+    Args:
+        pnts (int) - number of points
+        order (int) - order of the spline
+        endpoint (bool) - whether the spline uses endpoints
+        bezier (bool) - whether the spline uses bezier knots
+        cyclic (bool) - whether the spline is cyclic
+
+    Returns:
+        (numpy.ndarray) - the knot vector
+    '''
+    key = (pnts, order, bool(endpoint), bool(bezier), bool(cyclic))
+    knots = __NURBS_KNOTS_CACHE__.get(key, None)
+    if knots is None:
+        knots = [0.0] * (4 + order + pnts + (order - 1 if cyclic else 0))
+        if cyclic:
+            calcknots(knots, pnts, order, 0)
+            makecyclicknots(knots, pnts, order)
+        else:
+            calcknots(knots, pnts, order, int(bool(endpoint)) + (int(bool(bezier)) << 1))
+        knots = np.array(knots, dtype=np.float64)
+        knots.flags.writeable = False
+        __NURBS_KNOTS_CACHE__[key] = knots
+    return knots
+
 class RmanNurbsTranslator(RmanTranslator):
 
     def __init__(self, rman_scene):
@@ -219,9 +252,9 @@ class RmanNurbsTranslator(RmanTranslator):
         if uorder == 0 or vorder == 0:
             return
 
-        P = []
-        for pt in spline.points:
-            P.append(pt.co)            
+        P = np.zeros(len(spline.points) * 4, dtype=np.float32)
+        spline.points.foreach_get('co', P)
+        P = np.reshape(P, (len(spline.points), 4))
 
         '''
         # we currently don't support use_cyclic_u and use_cuclic_v options    
@@ -245,20 +278,16 @@ class RmanNurbsTranslator(RmanTranslator):
         '''
      
         pnts_order = spline.point_count_u + spline.order_u
-        uknots = [0.0] * pnts_order
-        flag = spline.use_endpoint_u + (spline.use_bezier_u << 1)
-        calcknots(uknots, spline.point_count_u, spline.order_u, flag)
+        uknots = get_knots(spline.point_count_u, spline.order_u, spline.use_endpoint_u, spline.use_bezier_u)[:pnts_order]
 
         pnts_order = spline.point_count_v + spline.order_v
-        vknots = [0.0] * pnts_order
-        flag = spline.use_endpoint_v + (spline.use_bezier_v << 1)
-        calcknots(vknots, spline.point_count_v, spline.order_v, flag)
+        vknots = get_knots(spline.point_count_v, spline.order_v, spline.use_endpoint_v, spline.use_bezier_v)[:pnts_order]
 
         rman_sg_nurbs.sg_node.Define(nu, uorder, nv, vorder)
         
         primvar = rman_sg_nurbs.sg_node.GetPrimVars()
-        primvar.SetHpointDetail(self.rman_scene.rman.Tokens.Rix.k_Pw, P, "vertex")   
-        primvar.SetFloatArray(self.rman_scene.rman.Tokens.Rix.k_Ri_uknot, uknots, len(uknots))
-        primvar.SetFloatArray(self.rman_scene.rman.Tokens.Rix.k_Ri_vknot, vknots, len(vknots))
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetHpointDetail', self.rman_scene.rman.Tokens.Rix.k_Pw, P, "vertex")
+        primvar.SetFloatArray(self.rman_scene.rman.Tokens.Rix.k_Ri_uknot, uknots.tolist(), len(uknots))
+        primvar.SetFloatArray(self.rman_scene.rman.Tokens.Rix.k_Ri_vknot, vknots.tolist(), len(vknots))
 
         rman_sg_nurbs.sg_node.SetPrimVars(primvar)
@@ -9,6 +9,44 @@ from ..rfb_utils.envconfig_utils import envconfig
 from ..rfb_logger import rfb_log
 import json
 import os
+
+__OPENVDB_GRIDS_METADATA__ = dict()
+
+def get_openvdb_grids_metadata(grids, openvdb_file):
+    '''Get the names and data types of the grids in an OpenVDB file. The metadata
+    is cached by file path, size and modification time, so the grids only need to be
+    loaded the first time a file is seen.
+
+    Args:
+        grids (bpy.types.VolumeGrids) - the grids of the volume
+        openvdb_file (str) - real path to the OpenVDB file. Can be empty if the path is
+                            not known until the grids are loaded
+
+    Returns:
+        (list) - list of (name, data_type) tuples, or None if the grids could not be loaded
+    '''
+    key = None
+    if openvdb_file:
+        try:
+            st = os.stat(openvdb_file)
+            key = (openvdb_file, st.st_size, st.st_mtime_ns)
+        except OSError:
+            pass
+
+    if key:
+        metadata = __OPENVDB_GRIDS_METADATA__.get(key, None)
+        if metadata is not None:
+            return metadata
+
+    if not grids.is_loaded:
+        if not grids.load():
+            return None
+
+    metadata = [(grid.name, grid.data_type) for grid in grids]
+    if key:
+        __OPENVDB_GRIDS_METADATA__[key] = metadata
+    return metadata
+
 class RmanOpenVDBTranslator(RmanTranslator):
 
     def __init__(self, rman_scene):
@@ -51,6 +89,15 @@ class RmanOpenVDBTranslator(RmanTranslator):
     def export_deform_sample(self, rman_sg_openvdb, ob, time_sample):
         pass
 
+    def _get_openvdb_file(self, db):
+        if db.is_sequence:
+            # if we have a sequence, get the current frame filepath from the grids
+            frame_filepath = db.grids.frame_filepath
+            if not frame_filepath:
+                return ''
+            return filepath_utils.get_real_path(frame_filepath)
+        return filepath_utils.get_real_path(db.filepath)
+
     def update(self, ob, rman_sg_openvdb):
         db = ob.data
         rm = db.renderman
@@ -65,27 +112,27 @@ class RmanOpenVDBTranslator(RmanTranslator):
             return
 
         grids = db.grids
-        if not grids.is_loaded:
-            if not grids.load():
-                rfb_log().error("Could not load grids and metadata for volume: %s" % ob.name)
-                primvar.SetString(self.rman_scene.rman.Tokens.Rix.k_Ri_type, "box")
-                rman_sg_openvdb.sg_node.SetPrimVars(primvar)   
-                return
+        openvdb_file = self._get_openvdb_file(db)
+        metadata = get_openvdb_grids_metadata(grids, openvdb_file)
+        if not metadata:
+            rfb_log().error("Could not load grids and metadata for volume: %s" % ob.name)
+            primvar.SetString(self.rman_scene.rman.Tokens.Rix.k_Ri_type, "box")
+            rman_sg_openvdb.sg_node.SetPrimVars(primvar)   
+            return
+        if not openvdb_file:
+            # the frame file path is only known after the grids are loaded
+            openvdb_file = self._get_openvdb_file(db)
 
         active_index = grids.active_index
-        active_grid = grids[active_index]  
-        if active_grid.data_type not in ['FLOAT', 'DOUBLE']:  
+        if active_index < 0 or active_index >= len(metadata):
+            active_index = 0
+        active_grid_name, active_grid_type = metadata[active_index]
+        if active_grid_type not in ['FLOAT', 'DOUBLE']:  
             rfb_log().error("Active grid is not of float type: %s" % ob.name)
             primvar.SetString(self.rman_scene.rman.Tokens.Rix.k_Ri_type, "box")
             rman_sg_openvdb.sg_node.SetPrimVars(primvar)   
             return                      
 
-        
-        openvdb_file = filepath_utils.get_real_path(db.filepath)
-        if db.is_sequence:
-            # if we have a sequence, get the current frame filepath from the grids
-            openvdb_file = filepath_utils.get_real_path(grids.frame_filepath)     
-
         #openvdb_file = texture_utils.get_txmanager().get_output_vdb(ob)
 
         openvdb_attrs = dict()
@@ -99,20 +146,20 @@ class RmanOpenVDBTranslator(RmanTranslator):
         primvar.SetString(self.rman_scene.rman.Tokens.Rix.k_Ri_type, "blobbydso:impl_openvdb")  
         string_args = []
         string_args.append(openvdb_file)
-        string_args.append("%s:fogvolume" % active_grid.name)
+        string_args.append("%s:fogvolume" % active_grid_name)
         string_args.append('')
         string_args.append(json_attrs)
         primvar.SetStringArray(self.rman_scene.rman.Tokens.Rix.k_blobbydso_stringargs, string_args, len(string_args))
 
-        for i, grid in enumerate(grids):
-            if grid.data_type in ['FLOAT', 'DOUBLE']:
-                primvar.SetFloatDetail(grid.name, [], "varying")
-            elif grid.data_type in ['VECTOR_FLOAT', 'VECTOR_DOUBLE', 'VECTOR_INT']:
-                primvar.SetVectorDetail(grid.name, [], "varying")
-            elif grid.data_type in ['INT', 'INT64', 'BOOLEAN']:
-                primvar.SetIntegerDetail(grid.name, [], "varying")
-            elif grid.data_type == 'STRING':
-                primvar.SetStringDetail(grid.name, [], "uniform")
+        for grid_name, grid_type in metadata:
+            if grid_type in ['FLOAT', 'DOUBLE']:
+                primvar.SetFloatDetail(grid_name, [], "varying")
+            elif grid_type in ['VECTOR_FLOAT', 'VECTOR_DOUBLE', 'VECTOR_INT']:
+                primvar.SetVectorDetail(grid_name, [], "varying")
+            elif grid_type in ['INT', 'INT64', 'BOOLEAN']:
+                primvar.SetIntegerDetail(grid_name, [], "varying")
+            elif grid_type == 'STRING':
+                primvar.SetStringDetail(grid_name, [], "uniform")
 
         scenegraph_utils.export_vol_aggregate(self.rman_scene.bl_scene, primvar, ob)     
 
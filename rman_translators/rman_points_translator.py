@@ -1,7 +1,9 @@
 from .rman_translator import RmanTranslator
+from ..rfb_logger import rfb_log
 from ..rman_sg_nodes.rman_sg_points import RmanSgPoints
 from ..rfb_utils import object_utils
 from ..rfb_utils import string_utils
+from ..rfb_utils import scenegraph_utils
 
 import bpy
 import math
@@ -17,6 +19,10 @@ class RmanPointsTranslator(RmanTranslator):
         sg_node = self.rman_scene.sg_scene.CreatePoints(db_name)
         rman_sg_points = RmanSgPoints(self.rman_scene, sg_node, db_name)
 
+        if self.rman_scene.do_motion_blur:
+            rman_sg_points.is_transforming = object_utils.is_transforming(ob)
+            rman_sg_points.is_deforming = object_utils._is_deforming_(ob)
+
         return rman_sg_points
 
     def export_deform_sample(self, rman_sg_points, ob, time_sample):
@@ -35,7 +41,7 @@ class RmanPointsTranslator(RmanTranslator):
             rman_sg_points.is_deforming = False        
             return         
         
-        primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex", time_sample)
+        scenegraph_utils.set_primvar_bulk_data(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex", time_sample)
 
         rman_sg_points.sg_node.SetPrimVars(primvar) 
 
@@ -50,14 +56,22 @@ class RmanPointsTranslator(RmanTranslator):
         P = object_utils._get_mesh_points_(mesh)
 
         # if this is empty continue:
-        if not P or len(P) < 1:
+        if len(P) < 1:
             if not input_mesh:
                 ob.to_mesh_clear()
             rman_sg_points.sg_node = None
             rman_sg_points.is_transforming = False
             rman_sg_points.is_deforming = False
+            rman_sg_points.fingerprint = None
             return None        
 
+        if self.rman_scene.is_interactive:
+            fingerprint = self.get_fingerprint(rm.primitive_point_width, rman_sg_points.deform_motion_steps, P)
+            if self.is_unchanged(rman_sg_points, fingerprint):
+                if not input_mesh:
+                    ob.to_mesh_clear()
+                return True
+
         npoints = len(P)
         rman_sg_points.sg_node.Define(npoints)
         rman_sg_points.npoints = npoints
@@ -65,9 +79,21 @@ class RmanPointsTranslator(RmanTranslator):
         primvar = rman_sg_points.sg_node.GetPrimVars()
         primvar.Clear()      
 
-        super().set_primvar_times(rman_sg_points.motion_steps, steps)
-
-        primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")
+        velocity = None
+        if rman_sg_points.is_deforming and rman_sg_points.use_velocity_blur:
+            velocity = object_utils._get_mesh_velocity_(ob, mesh)
+            if velocity is None or len(velocity) != npoints:
+                rfb_log().warning("Could not find velocity attribute '%s' for: %s. Deformation blur disabled." % (rm.deform_velocity_attr, ob.name))
+                rman_sg_points.is_deforming = False
+                velocity = None
+
+        if rman_sg_points.is_deforming and len(rman_sg_points.deform_motion_steps) > 1:
+            super().set_primvar_times(rman_sg_points.deform_motion_steps, primvar)
+
+        if velocity is not None:
+            self.set_velocity_deform_samples(rman_sg_points, ob, primvar, P, velocity)
+        else:
+            scenegraph_utils.set_primvar_bulk_data(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")
         primvar.SetFloatDetail(self.rman_scene.rman.Tokens.Rix.k_constantwidth, rm.primitive_point_width, "constant")
             
         rman_sg_points.sg_node.SetPrimVars(primvar)         
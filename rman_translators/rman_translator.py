@@ -6,8 +6,10 @@ from ..rfb_utils import object_utils
 from ..rfb_utils import prefs_utils
 from ..rfb_utils import shadergraph_utils
 from ..rfb_utils import scene_utils
+from ..rfb_utils import scenegraph_utils
 import hashlib
 import os
+import numpy as np
 
 class RmanTranslator(object):
     '''
@@ -52,6 +54,57 @@ class RmanTranslator(object):
     def update(self, ob, rman_sg_node):
         pass
 
+    def get_fingerprint(self, *data):
+        '''Compute a fast fingerprint of the data that goes into a scene graph node.
+        Translators compare this against rman_sg_node.fingerprint to decide if a node
+        needs to be re-translated.
+
+        Arguments:
+            data - NumPy arrays, or any other values with a stable repr()
+
+        Returns:
+            (bytes) - the fingerprint
+        '''
+        h = hashlib.blake2b(digest_size=16)
+        for d in data:
+            if isinstance(d, np.ndarray):
+                h.update(str((d.dtype, d.shape)).encode())
+                h.update(memoryview(np.ascontiguousarray(d)).cast('B'))
+            else:
+                h.update(repr(d).encode())
+        return h.digest()
+
+    def is_unchanged(self, rman_sg_node, fingerprint):
+        '''Check if fingerprint matches what was last translated into rman_sg_node,
+        and remember it if it doesn't.
+        '''
+        if fingerprint is not None and rman_sg_node.fingerprint == fingerprint:
+            return True
+        rman_sg_node.fingerprint = fingerprint
+        return False
+
+    def set_velocity_deform_samples(self, rman_sg_node, ob, primvar, P, velocity):
+        '''Set P for each of the deformation samples of rman_sg_node by moving the
+        points along velocity, rather than evaluating the object at every sample.
+
+        Arguments:
+            rman_sg_node (RmanSgNode) - the node being translated
+            ob (bpy.types.Object) - the object P was evaluated from
+            primvar (RtPrimVar) - primvars to set P on
+            P (numpy.ndarray) - (N,3) array of points at the current scene time
+            velocity (numpy.ndarray) - (N,3) array of velocities
+        '''
+        bl_scene = self.rman_scene.bl_scene
+        # the time, in frames, that P was evaluated at
+        cur_time = bl_scene.frame_current_final
+        fps = 1.0
+        if ob.renderman.deform_velocity_unit == 'SECOND':
+            fps = bl_scene.render.fps / bl_scene.render.fps_base
+
+        for i, seg in enumerate(sorted(rman_sg_node.deform_motion_steps)):
+            dt = (self.rman_scene.bl_frame_current + seg - cur_time) / fps
+            scenegraph_utils.set_primvar_bulk_data(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, P + velocity * dt, "vertex", i)
+
     def set_primvar_times(self, motion_steps, primvar):
         # take the motion steps, sort it and 
         # normalize it to lie between 0 and 1